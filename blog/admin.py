@@ -1,16 +1,32 @@
-from django.contrib import admin
-from .models import Category, Post, Author
+from django.contrib import admin, messages
+from django.contrib.admin.utils import unquote
+from django.core.exceptions import PermissionDenied
+from django.db.models import Q
+from django.http import Http404
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
+from django.utils.formats import date_format
+from django.utils.html import format_html_join
+from django.utils.safestring import mark_safe
+from .models import Category, Post, PostArchive, Author, get_revision
+from .retention import unarchive
+from .revisions import diff_lines
+from .search import get_backend
+
+# Revisiones enlazadas en el formulario de un post
+REVISION_HISTORY_LIMIT = 20
 
 
 @admin.action(description="Restaurar posts seleccionados")
 def restore_posts(modeladmin, request, queryset):
-    queryset.update(deleted_at=None)
+    restored = queryset.restore()
+    modeladmin.message_user(request, f"{restored} posts restaurados como borrador")
 
 
 class PostModelAdmin(admin.ModelAdmin):
-    list_display = ["title", "user", "status", "deleted_at", "is_featured"]
-    list_filter = ("status", "deleted_at", "user")
-    readonly_fields = ("created", "updated")
+    list_display = ["title", "user", "status", "is_live", "deleted_at", "is_featured"]
+    list_filter = ("status", "is_live", "deleted_at", "user")
+    readonly_fields = ("is_live", "revision_history", "created", "updated")
     prepopulated_fields = {"slug": ("title",)}
     actions = [restore_posts]
     search_fields = ["title", "content", "user__username"]
@@ -18,24 +34,165 @@ class PostModelAdmin(admin.ModelAdmin):
     def get_queryset(self, request):
         return Post.all_objects.all()
 
+    @admin.display(description="Historial")
+    def revision_history(self, obj):
+        if obj.pk is None:
+            return "-"
+        # Solo metadatos: el contenido se reconstruye al abrir una revision
+        revisions = obj.revisions.only("post", "number", "title", "created")[
+            :REVISION_HISTORY_LIMIT
+        ]
+        links = format_html_join(
+            mark_safe("<br>"),
+            '<a href="{}">#{}</a> {} &middot; {}',
+            (
+                (
+                    reverse(
+                        "admin:blog_post_revision",
+                        args=[obj.pk, revision.number],
+                    ),
+                    revision.number,
+                    date_format(revision.created, "SHORT_DATETIME_FORMAT"),
+                    revision.title,
+                )
+                for revision in revisions
+            ),
+        )
+        return links or "-"
+
+    def get_urls(self):
+        return [
+            path(
+                "<path:object_id>/revisions/<int:number>/",
+                self.admin_site.admin_view(self.revision_view),
+                name="blog_post_revision",
+            ),
+            *super().get_urls(),
+        ]
+
+    def revision_view(self, request, object_id, number):
+        """Diff de una revision contra la anterior (o contra ?against=N)."""
+        post = self.get_object(request, unquote(object_id))
+        if post is None:
+            raise Http404
+        if not self.has_view_or_change_permission(request, post):
+            raise PermissionDenied
+        revision = get_revision(post.pk, number)
+        try:
+            against = int(request.GET.get("against", number - 1))
+        except ValueError:
+            raise Http404
+        previous = get_revision(post.pk, against) if against > 0 else None
+        if revision is None or (against > 0 and previous is None):
+            raise Http404
+
+        before = set(previous.category_ids if previous else [])
+        after = set(revision.category_ids)
+        names = dict(
+            Category.objects.filter(pk__in=before | after).values_list("pk", "name")
+        )
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.opts,
+            "original": post,
+            "title": f"{post} - revision {number}",
+            "revision": revision,
+            "previous": previous,
+            "diff": diff_lines(
+                previous.content if previous else "",
+                revision.content,
+            ),
+            "added_categories": [names.get(pk, pk) for pk in sorted(after - before)],
+            "removed_categories": [names.get(pk, pk) for pk in sorted(before - after)],
+        }
+        return TemplateResponse(request, "admin/blog/post/revision.html", context)
+
+    def delete_queryset(self, request, queryset):
+        # "Eliminar seleccionados": un UPDATE y una señal para todo el lote
+        queryset.soft_delete()
+
+    def get_deleted_objects(self, objs, request):
+        # Borrado logico: no hay cascada que recorrer ni mostrar
+        objs = list(objs.only("title") if hasattr(objs, "only") else objs)
+        perms_needed = set()
+        if not self.has_delete_permission(request):
+            perms_needed.add(self.opts.verbose_name)
+        count = {self.opts.verbose_name_plural: len(objs)}
+        return [str(obj) for obj in objs], count, perms_needed, []
+
+    def get_search_results(self, request, queryset, search_term):
+        # Usa el indice de busqueda en lugar de LIKE '%q%' sobre content;
+        # el nombre de usuario se sigue buscando por subcadena, como antes.
+        # El indice solo tiene posts vivos: los eliminados (los que se
+        # buscan para restaurarlos) se buscan por subcadena en titulo y
+        # contenido.
+        backend = get_backend()
+        term = search_term.strip()
+        if backend is None or not term:
+            return super().get_search_results(request, queryset, search_term)
+        queryset = queryset.filter(
+            Q(pk__in=backend.matching_ids(search_term))
+            | Q(user__username__icontains=term)
+            | Q(deleted_at__isnull=False, title__icontains=term)
+            | Q(deleted_at__isnull=False, content__icontains=term)
+        )
+        return queryset, False
+
 
 class CategoryModelAdmin(admin.ModelAdmin):
-    readonly_fields = ("created", "updated")
+    list_display = ["name", "slug", "published_posts_count"]
+    readonly_fields = ("published_posts_count", "created", "updated")
     prepopulated_fields = {"slug": ("name",)}
     search_fields = ["name"]
 
 
 class AuthorModelAdmin(admin.ModelAdmin):
     list_display = ["user", "is_site_author", "get_posts_count", "created"]
-    readonly_fields = ["created", "updated"]
+    list_select_related = ["user"]
+    readonly_fields = ["published_posts_count", "created", "updated"]
     search_fields = ["user__username", "user__first_name", "user__last_name"]
 
     def get_posts_count(self, obj):
         return obj.get_posts_count()
 
     get_posts_count.short_description = "Posts publicados"
+    get_posts_count.admin_order_field = "published_posts_count"
+
+
+@admin.action(description="Restaurar posts archivados seleccionados")
+def restore_archived_posts(modeladmin, request, queryset):
+    posts, conflicts = unarchive(queryset)
+    Post.all_objects.filter(pk__in=[post.pk for post in posts]).restore()
+    if posts:
+        modeladmin.message_user(
+            request, f"{len(posts)} posts restaurados como borrador"
+        )
+    if conflicts:
+        slugs = ", ".join(row.slug for row in conflicts)
+        modeladmin.message_user(
+            request,
+            f"No se restauraron (el slug ya esta en uso): {slugs}",
+            messages.WARNING,
+        )
+
+
+class PostArchiveModelAdmin(admin.ModelAdmin):
+    """Posts purgados por purge_deleted; solo lectura, se pueden restaurar."""
+
+    list_display = ["title", "slug", "user", "deleted_at", "archived_at"]
+    list_select_related = ["user"]
+    date_hierarchy = "deleted_at"
+    search_fields = ["title", "slug"]
+    actions = [restore_archived_posts]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
 
 
 admin.site.register(Post, PostModelAdmin)
 admin.site.register(Category, CategoryModelAdmin)
 admin.site.register(Author, AuthorModelAdmin)
+admin.site.register(PostArchive, PostArchiveModelAdmin)
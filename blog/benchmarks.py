@@ -0,0 +1,231 @@
+"""
+Escenarios y medicion del comando benchmark.
+
+Cada escenario es una URL publica o del admin con un presupuesto de
+consultas que no depende del tamaño del corpus: si una vista lo supera,
+casi siempre es un N+1.
+"""
+
+import statistics
+import time
+from dataclasses import dataclass, field
+from typing import Callable
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser, User
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+
+from core import metrics
+from pages.models import Page
+
+from .fragments import bypass_fragments
+from .models import Author, Category, Post, PostMonth
+
+# Atributos de las vistas que se desactivan: se mide el render completo
+# (tambien sin cache de fragmentos, ver measure), y las consultas de las
+# vistas async en una sola conexion para contarlas
+BENCHMARK_OVERRIDES = {
+    "use_cache": False,
+    "track_views": False,
+    "concurrent_queries": False,
+}
+
+
+@dataclass
+class Scenario:
+    name: str
+    url: Callable[[], str]
+    max_queries: int
+    admin: bool = False
+
+
+@dataclass
+class Measurement:
+    name: str
+    url: str
+    status: int
+    queries: int
+    db_ms: float
+    template_ms: float
+    latencies_ms: list = field(default_factory=list)
+
+    @property
+    def p50_ms(self):
+        return statistics.median(self.latencies_ms)
+
+    @property
+    def p95_ms(self):
+        ordered = sorted(self.latencies_ms)
+        return ordered[min(round(0.95 * (len(ordered) - 1)), len(ordered) - 1)]
+
+    def as_dict(self):
+        return {
+            "queries": self.queries,
+            "db_ms": round(self.db_ms, 2),
+            "template_ms": round(self.template_ms, 2),
+            "p50_ms": round(self.p50_ms, 2),
+            "p95_ms": round(self.p95_ms, 2),
+        }
+
+
+def first_slug(queryset):
+    return queryset.values_list("slug", flat=True).first()
+
+
+def busiest_category():
+    return first_slug(Category.objects.order_by("-published_posts_count"))
+
+
+def busiest_author():
+    return (
+        Author.objects.order_by("-published_posts_count")
+        .values_list("pk", flat=True)
+        .first()
+    )
+
+
+def busiest_month():
+    month = PostMonth.objects.order_by("-published_posts_count").first()
+    return {"year": month.year, "month": month.month}
+
+
+SCENARIOS = [
+    Scenario("home", lambda: reverse("home"), 10),
+    Scenario("list_posts", lambda: reverse("blog:list_posts"), 6),
+    Scenario(
+        "detail_post",
+        lambda: reverse(
+            "blog:detail_post", kwargs={"slug": first_slug(Post.objects.published())}
+        ),
+        7,
+    ),
+    Scenario(
+        "detail_category",
+        lambda: reverse("blog:detail_category", kwargs={"slug": busiest_category()}),
+        7,
+    ),
+    Scenario(
+        "author_detail",
+        lambda: reverse("blog:author_detail", kwargs={"pk": busiest_author()}),
+        7,
+    ),
+    Scenario(
+        "archive_month",
+        lambda: reverse("blog:archive_month", kwargs=busiest_month()),
+        7,
+    ),
+    Scenario(
+        "page_detail",
+        lambda: reverse(
+            "pages:page_detail", kwargs={"slug": first_slug(Page.objects)}
+        ),
+        5,
+    ),
+    Scenario("admin_posts", lambda: reverse("admin:blog_post_changelist"), 12, True),
+    Scenario(
+        "admin_categories", lambda: reverse("admin:blog_category_changelist"), 8, True
+    ),
+    Scenario(
+        "admin_authors", lambda: reverse("admin:blog_author_changelist"), 8, True
+    ),
+    Scenario("admin_pages", lambda: reverse("admin:pages_page_changelist"), 8, True),
+]
+
+
+def get_benchmark_user():
+    user = User.objects.filter(is_superuser=True, is_active=True).first()
+    if user is None:
+        user = User(username="benchmark", is_staff=True, is_superuser=True)
+        user.set_unusable_password()
+        user.save()
+    return user
+
+
+def call_view(url, user):
+    match = resolve(url.split("?")[0])
+    request = RequestFactory().get(url)
+    request.user = user
+    view_class = getattr(match.func, "view_class", None)
+    if view_class is None:  # vistas del admin
+        view = match.func
+    else:
+        view = view_class.as_view(
+            **{
+                name: value
+                for name, value in BENCHMARK_OVERRIDES.items()
+                if hasattr(view_class, name)
+            }
+        )
+        if view_class.view_is_async:
+            view = async_to_sync(view)
+    response = view(request, *match.args, **match.kwargs)
+    if hasattr(response, "render"):
+        response.render()
+    return response
+
+
+def measure(scenario, iterations=20, user=None):
+    """
+    Ejecuta el escenario `iterations` veces (mas una de calentamiento).
+    Consultas, tiempo de base de datos y de plantillas son de la ultima
+    ejecucion; las latencias son de todas.
+
+    Las ejecuciones medidas no usan la cache de fragmentos: el
+    calentamiento la llenaria y un N+1 dentro de una tarjeta no contaria.
+    """
+    if iterations < 1:
+        raise ValueError("iterations debe ser al menos 1")
+    url = scenario.url()
+    user = user or (get_benchmark_user() if scenario.admin else AnonymousUser())
+    call_view(url, user)
+
+    # La misma instrumentacion que PerformanceMiddleware
+    metrics.install_query_recorder()
+    metrics.install_template_timer()
+    latencies = []
+    for _ in range(iterations):
+        current = metrics.RequestMetrics()
+        token = metrics.activate(current)
+        try:
+            with bypass_fragments():
+                started = time.perf_counter()
+                response = call_view(url, user)
+                latencies.append((time.perf_counter() - started) * 1000)
+        finally:
+            metrics.deactivate(token)
+
+    return Measurement(
+        name=scenario.name,
+        url=url,
+        status=response.status_code,
+        queries=current.queries,
+        db_ms=current.db_time * 1000,
+        # Las consultas lanzadas desde las plantillas cuentan como DB
+        template_ms=(current.template_time - current.template_db_time) * 1000,
+        latencies_ms=latencies,
+    )
+
+
+def check(measurement, scenario, baseline=None, tolerance=0.25):
+    """Lista de problemas: presupuesto superado o regresion sobre la linea base."""
+    problems = []
+    if measurement.status != 200:
+        problems.append(f"respondio {measurement.status}")
+    if measurement.queries > scenario.max_queries:
+        problems.append(
+            f"{measurement.queries} consultas (presupuesto {scenario.max_queries})"
+        )
+    if baseline:
+        if measurement.queries > baseline["queries"]:
+            problems.append(
+                f"{measurement.queries} consultas (linea base {baseline['queries']})"
+            )
+        # Se compara p50, mas estable que p95 con pocas iteraciones; el margen
+        # absoluto evita falsos positivos en vistas de pocos ms.
+        limit = max(baseline["p50_ms"] * (1 + tolerance), baseline["p50_ms"] + 2)
+        if measurement.p50_ms > limit:
+            problems.append(
+                f"p50 {measurement.p50_ms:.1f}ms (linea base {baseline['p50_ms']}ms)"
+            )
+    return problems
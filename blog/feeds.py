@@ -0,0 +1,163 @@
+from xml.sax.saxutils import escape, quoteattr
+
+from django.conf import settings
+from django.http import Http404, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.feedgenerator import rfc2822_date, rfc3339_date
+from django.views import View
+
+from .mixins import CachedResponseMixin
+from .models import Author, Category, Post
+from .signals import CONTENT_VERSION
+
+FEED_CONTENT_TYPES = {
+    "atom": "application/atom+xml; charset=utf-8",
+    "rss": "application/rss+xml; charset=utf-8",
+}
+SITE_TITLE = "Blog CMS"
+
+
+def author_name(user):
+    return user.get_full_name() or user.username
+
+
+class PostFeedView(CachedResponseMixin, View):
+    """
+    Feed Atom o RSS (kwarg `feed_format`) de los ultimos posts publicados.
+
+    El XML se genera entrada por entrada sobre un `.iterator()`, de modo que
+    la memoria no depende del numero de items; la respuesta completa se
+    guarda en cache con la version de contenido del blog.
+    """
+
+    feed_format = "atom"
+    cache_versions = (CONTENT_VERSION,)
+
+    def get_object(self):
+        return None
+
+    def get_title(self, obj):
+        return SITE_TITLE
+
+    def get_link(self, obj):
+        return reverse("blog:list_posts")
+
+    def get_queryset(self, obj):
+        return Post.objects.published()
+
+    def get_items(self, obj):
+        limit = getattr(settings, "BLOG_FEED_ITEMS", 50)
+        items = (
+            self.get_queryset(obj)
+            .select_related("user")
+            .defer("content", "image_meta")[:limit]
+        )
+        return items.iterator(chunk_size=100)
+
+    def get(self, request, *args, feed_format=None, **kwargs):
+        feed_format = feed_format or self.feed_format
+        if feed_format not in FEED_CONTENT_TYPES:
+            raise Http404("Formato de feed desconocido")
+        obj = self.get_object()
+        generate = self.atom if feed_format == "atom" else self.rss
+        return StreamingHttpResponse(
+            self.encode(generate(obj)),
+            content_type=FEED_CONTENT_TYPES[feed_format],
+        )
+
+    @staticmethod
+    def encode(chunks):
+        for chunk in chunks:
+            yield chunk.encode()
+
+    def atom(self, obj):
+        absolute = self.request.build_absolute_uri
+        items = self.get_items(obj)
+        first = next(items, None)
+        updated = first.publish_at if first else timezone.now()
+        yield (
+            '<?xml version="1.0" encoding="utf-8"?>\n'
+            '<feed xmlns="http://www.w3.org/2005/Atom" xml:lang="es">'
+            f"<title>{escape(self.get_title(obj))}</title>"
+            f"<link href={quoteattr(absolute(self.get_link(obj)))} rel=\"alternate\"/>"
+            f"<link href={quoteattr(absolute())} rel=\"self\"/>"
+            f"<id>{escape(absolute(self.get_link(obj)))}</id>"
+            f"<updated>{rfc3339_date(updated)}</updated>"
+        )
+        if first is not None:
+            yield self.atom_entry(first)
+            for post in items:
+                yield self.atom_entry(post)
+        yield "</feed>"
+
+    def atom_entry(self, post):
+        url = self.request.build_absolute_uri(post.get_absolute_url())
+        return (
+            "<entry>"
+            f"<title>{escape(post.title)}</title>"
+            f"<link href={quoteattr(url)} rel=\"alternate\"/>"
+            f"<id>{escape(url)}</id>"
+            f"<published>{rfc3339_date(post.publish_at)}</published>"
+            f"<updated>{rfc3339_date(post.updated)}</updated>"
+            f"<author><name>{escape(author_name(post.user))}</name></author>"
+            f"<summary>{escape(post.excerpt)}</summary>"
+            f"<content type=\"html\">{escape(post.content_html)}</content>"
+            "</entry>"
+        )
+
+    def rss(self, obj):
+        absolute = self.request.build_absolute_uri
+        yield (
+            '<?xml version="1.0" encoding="utf-8"?>\n'
+            '<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom"'
+            ' xmlns:dc="http://purl.org/dc/elements/1.1/"><channel>'
+            f"<title>{escape(self.get_title(obj))}</title>"
+            f"<link>{escape(absolute(self.get_link(obj)))}</link>"
+            f"<description>{escape(self.get_title(obj))}</description>"
+            f"<atom:link href={quoteattr(absolute())} rel=\"self\"/>"
+            "<language>es</language>"
+        )
+        for post in self.get_items(obj):
+            url = absolute(post.get_absolute_url())
+            yield (
+                "<item>"
+                f"<title>{escape(post.title)}</title>"
+                f"<link>{escape(url)}</link>"
+                f"<guid isPermaLink=\"true\">{escape(url)}</guid>"
+                f"<pubDate>{rfc2822_date(post.publish_at)}</pubDate>"
+                f"<dc:creator>{escape(author_name(post.user))}</dc:creator>"
+                f"<description>{escape(post.content_html)}</description>"
+                "</item>"
+            )
+        yield "</channel></rss>"
+
+
+class CategoryFeedView(PostFeedView):
+    def get_object(self):
+        return get_object_or_404(Category, slug=self.kwargs["slug"])
+
+    def get_title(self, obj):
+        return f"{SITE_TITLE}: {obj.name}"
+
+    def get_link(self, obj):
+        return reverse("blog:detail_category", kwargs={"slug": obj.slug})
+
+    def get_queryset(self, obj):
+        return Post.objects.published().filter(categories=obj)
+
+
+class AuthorFeedView(PostFeedView):
+    def get_object(self):
+        authors = Author.objects.select_related("user")
+        return get_object_or_404(authors, pk=self.kwargs["pk"])
+
+    def get_title(self, obj):
+        return f"{SITE_TITLE}: {obj}"
+
+    def get_link(self, obj):
+        return reverse("blog:author_detail", kwargs={"pk": obj.pk})
+
+    def get_queryset(self, obj):
+        return Post.objects.published().filter(user_id=obj.user_id)
@@ -0,0 +1,92 @@
+"""
+Cache de fragmentos de plantilla (tarjetas de posts, categorias y autor).
+
+La clave depende de la identidad y de `updated` de los objetos, de modo
+que un fragmento nunca se invalida: al cambiar el objeto cambia la clave.
+Por eso se puede guardar tambien en la memoria del proceso.
+"""
+
+import hashlib
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models
+
+from core.cache import LocalCache
+from core.metrics import record_fragment
+
+_missing = object()
+_bypass = ContextVar("fragment_bypass", default=False)
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+local_fragments = LocalCache(
+    max_entries=getattr(settings, "FRAGMENT_CACHE_LOCAL_ENTRIES", 2000),
+    ttl=getattr(settings, "FRAGMENT_CACHE_LOCAL_TTL", 300),
+)
+
+
+def vary_part(value):
+    if isinstance(value, models.Model):
+        updated = getattr(value, "updated", None)
+        stamp = updated.timestamp() if updated else ""
+        return f"{value._meta.label_lower}.{value.pk}.{stamp}"
+    return repr(value)
+
+
+def fragment_key(name, *vary_on):
+    """
+    Clave de un fragmento: los modelos aportan (label, pk, updated) y el
+    resto de valores su repr, por ejemplo contadores que no tocan `updated`.
+    """
+    parts = ":".join(vary_part(value) for value in vary_on)
+    digest = hashlib.md5(parts.encode(), usedforsecurity=False).hexdigest()
+    return f"fragment:{name}:{digest}"
+
+
+@contextmanager
+def bypass_fragments():
+    """
+    Renderiza los fragmentos sin leer ni escribir la cache. Lo usa el
+    benchmark: con los fragmentos calientes no se mediria ninguna tarjeta.
+    """
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+def get_or_render(key, render):
+    if _bypass.get():
+        return render()
+    content = local_fragments.get(key, _missing)
+    if content is _missing:
+        content = cache.get(key, _missing)
+        if content is not _missing:
+            local_fragments.set(key, content)
+    hit = content is not _missing
+    if not hit:
+        content = render()
+        cache.set(key, content, getattr(settings, "FRAGMENT_CACHE_TIMEOUT", 86400))
+        local_fragments.set(key, content)
+
+    record_fragment(hit)
+    with _stats_lock:
+        _stats["hits" if hit else "misses"] += 1
+    return content
+
+
+def fragment_stats():
+    """Aciertos y fallos acumulados en este proceso."""
+    with _stats_lock:
+        hits, misses = _stats["hits"], _stats["misses"]
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": hits / total if total else 0.0,
+    }
@@ -0,0 +1,94 @@
+import atexit
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+
+class HitBuffer:
+    """
+    Buffer en memoria (por proceso) de visitas a posts.
+
+    Las vistas solo incrementan un contador local; las visitas se escriben
+    por lotes en `PostDailyViews` desde un hilo en segundo plano, de modo
+    que una request nunca bloquea filas con un UPDATE.
+    """
+
+    def __init__(self, max_size=None, interval=None):
+        self.max_size = max_size or getattr(settings, "BLOG_VIEWS_BUFFER_SIZE", 500)
+        self.interval = interval or getattr(settings, "BLOG_VIEWS_FLUSH_INTERVAL", 30)
+        self._lock = threading.Lock()
+        self._hits = Counter()
+        self._pending = 0
+        self._last_flush = time.monotonic()
+        self._flushing = False
+
+    def record(self, post_id):
+        with self._lock:
+            self._hits[(post_id, timezone.localdate())] += 1
+            self._pending += 1
+            due = (
+                self._pending >= self.max_size
+                or time.monotonic() - self._last_flush >= self.interval
+            )
+            if not due or self._flushing:
+                return
+            self._flushing = True
+
+        threading.Thread(target=self._flush_in_background, daemon=True).start()
+
+    def _take(self):
+        with self._lock:
+            hits, self._hits = self._hits, Counter()
+            self._pending = 0
+            self._last_flush = time.monotonic()
+        return hits
+
+    def flush(self):
+        """Escribe las visitas acumuladas; retorna el numero de filas insertadas."""
+        from .models import Post, PostDailyViews
+
+        hits = self._take()
+        if not hits:
+            return 0
+        # Un post borrado (o archivado) desde la visita haria fallar la
+        # clave foranea del lote completo: sus visitas se descartan.
+        existing = set(
+            Post.all_objects.filter(
+                pk__in={post_id for post_id, day in hits}
+            ).values_list("pk", flat=True)
+        )
+        rows = [
+            PostDailyViews(post_id=post_id, day=day, hits=count)
+            for (post_id, day), count in hits.items()
+            if post_id in existing
+        ]
+        PostDailyViews.objects.bulk_create(rows, batch_size=500)
+        return len(rows)
+
+    def _flush_in_background(self):
+        try:
+            self.flush()
+        finally:
+            self._flushing = False
+            # El hilo abre su propia conexion; no debe quedar abierta.
+            connections.close_all()
+
+
+buffer = HitBuffer()
+
+
+def record_hit(post_id):
+    buffer.record(post_id)
+
+
+@atexit.register
+def _flush_on_exit():
+    try:
+        buffer.flush()
+    except Exception:
+        # Al apagar el proceso la base de datos puede no estar disponible.
+        pass
@@ -0,0 +1,213 @@
+import logging
+import multiprocessing
+import posixpath
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from io import BytesIO
+
+import django
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from django.utils import timezone
+from PIL import ExifTags, Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+VARIANTS_DIR = "variants"
+# (extension, formato de Pillow, tipo MIME); el primero es el preferido
+VARIANT_FORMATS = (
+    ("webp", "WEBP", "image/webp"),
+    ("jpg", "JPEG", "image/jpeg"),
+)
+# Orientaciones EXIF que intercambian ancho y alto
+ROTATED_ORIENTATIONS = {5, 6, 7, 8}
+# Campo de imagen -> campo JSON con sus metadatos
+IMAGE_FIELDS = {"image": "image_meta", "avatar": "avatar_meta"}
+
+
+def get_widths():
+    return tuple(getattr(settings, "BLOG_IMAGE_WIDTHS", (320, 640, 1280)))
+
+
+def get_quality():
+    return getattr(settings, "BLOG_IMAGE_QUALITY", 80)
+
+
+def generate_variants(name, widths=None, quality=None):
+    """
+    Genera las variantes redimensionadas de `name` (en default_storage) en
+    cada formato de VARIANT_FORMATS. Se ejecuta en los procesos del pool.
+
+    Retorna los metadatos que se guardan en el modelo:
+    {"source", "width", "height", "variants": {ext: [[ancho, nombre], ...]}}
+    """
+    widths = widths or get_widths()
+    quality = quality or get_quality()
+    with default_storage.open(name, "rb") as f:
+        image = Image.open(f)
+        # Orientacion leida de la cabecera: la imagen sigue sin decodificar
+        width, height = stored = image.size
+        if image.getexif().get(ExifTags.Base.Orientation) in ROTATED_ORIENTATIONS:
+            width, height = height, width
+        targets = sorted({w for w in widths if w < width} | {min(width, max(widths))})
+        # JPEG se decodifica directamente a una escala reducida; draft() se
+        # aplica antes de cualquier load(), sobre el tamaño sin rotar.
+        scale = targets[-1] / width
+        image.draft("RGB", tuple(max(round(side * scale), 1) for side in stored))
+        image = ImageOps.exif_transpose(image)
+        image.load()
+
+    has_alpha = image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+    image = image.convert("RGBA" if has_alpha else "RGB")
+    stem = posixpath.splitext(name)[0]
+    variants = {ext: [] for ext, _, _ in VARIANT_FORMATS}
+    for target in targets:
+        size = (target, max(round(height * target / width), 1))
+        resized = image if image.size == size else image.resize(size, Image.LANCZOS)
+        for ext, pil_format, _ in VARIANT_FORMATS:
+            output = BytesIO()
+            if pil_format == "JPEG":
+                resized.convert("RGB").save(
+                    output, pil_format, quality=quality, optimize=True, progressive=True
+                )
+            else:
+                resized.save(output, pil_format, quality=quality, method=4)
+            path = posixpath.join(VARIANTS_DIR, f"{stem}-{target}w.{ext}")
+            if default_storage.exists(path):
+                default_storage.delete(path)
+            saved = default_storage.save(path, ContentFile(output.getvalue()))
+            variants[ext].append([target, saved])
+    return {"source": name, "width": width, "height": height, "variants": variants}
+
+
+def delete_variants(meta, keep=None):
+    """Elimina del storage los archivos de `meta` que no esten en `keep`."""
+    kept = {
+        name for entries in (keep or {}).get("variants", {}).values() for _, name in entries
+    }
+    for entries in (meta or {}).get("variants", {}).values():
+        for _, name in entries:
+            if name not in kept:
+                default_storage.delete(name)
+
+
+class ImageVariants:
+    """
+    Acceso de los templates a las variantes de una imagen sin abrir el
+    archivo: todo sale de los metadatos guardados en el modelo. Mientras
+    las variantes no existan se usa la imagen original.
+    """
+
+    def __init__(self, field, meta):
+        self.field = field
+        name = field.name if field else None
+        self.meta = meta if meta and meta.get("source") == name else {}
+
+    def __bool__(self):
+        return bool(self.field)
+
+    @property
+    def width(self):
+        return self.meta.get("width")
+
+    @property
+    def height(self):
+        return self.meta.get("height")
+
+    @property
+    def url(self):
+        fallback = self.meta.get("variants", {}).get("jpg")
+        if fallback:
+            # La variante mas grande que no supera el ancho medio de una card
+            name = fallback[0][1]
+            for width, candidate in fallback:
+                if width <= 640:
+                    name = candidate
+            return default_storage.url(name)
+        return self.field.url
+
+    def srcset(self, ext):
+        entries = self.meta.get("variants", {}).get(ext, [])
+        return ", ".join(
+            f"{default_storage.url(name)} {width}w" for width, name in entries
+        )
+
+    def sources(self):
+        """[(tipo MIME, srcset)] para los <source> de un <picture>."""
+        return [
+            (mime, self.srcset(ext))
+            for ext, _, mime in VARIANT_FORMATS
+            if self.meta.get("variants", {}).get(ext)
+        ]
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """
+    Pool de procesos compartido del proceso web. Usa `spawn` para no
+    heredar hilos ni conexiones del servidor; cada hijo ejecuta django.setup().
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=getattr(settings, "BLOG_IMAGE_WORKERS", 2),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=django.setup,
+            )
+    return _executor
+
+
+def store_meta(model, pk, field_name, name, meta):
+    """
+    Guarda los metadatos si el campo sigue apuntando a `name` (la imagen
+    pudo cambiar mientras se procesaba) y borra las variantes anteriores.
+    """
+    from core.cache import bump_version
+
+    from .signals import CONTENT_VERSION
+
+    meta_field = IMAGE_FIELDS[field_name]
+    rows = model._base_manager.filter(pk=pk, **{field_name: name})
+    previous = rows.values_list(meta_field, flat=True).first()
+    # `updated` invalida los ETag y la exportacion estatica de la pagina
+    if rows.update(**{meta_field: meta, "updated": timezone.now()}):
+        delete_variants(previous, keep=meta)
+        bump_version(CONTENT_VERSION)
+    else:
+        delete_variants(meta)
+
+
+def _store_result(model, pk, field_name, name, future):
+    try:
+        store_meta(model, pk, field_name, name, future.result())
+    except Exception:
+        logger.exception("No se pudieron generar las variantes de %s", name)
+    finally:
+        # El callback corre en un hilo del pool; no debe dejar conexiones.
+        connections.close_all()
+
+
+def schedule_variants(instance, field_name):
+    """
+    Encola la generacion de variantes de `instance.<field_name>` tras el
+    commit. Con BLOG_IMAGE_ASYNC = False se procesa en la misma request.
+    """
+    model = type(instance)
+    pk = instance.pk
+    name = getattr(instance, field_name).name
+
+    def run():
+        if getattr(settings, "BLOG_IMAGE_ASYNC", True):
+            future = get_executor().submit(generate_variants, name)
+            future.add_done_callback(partial(_store_result, model, pk, field_name, name))
+        else:
+            store_meta(model, pk, field_name, name, generate_variants(name))
+
+    transaction.on_commit(run)
@@ -0,0 +1,84 @@
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.benchmarks import SCENARIOS, check, measure
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide consultas, tiempo de base de datos, de plantillas y latencia "
+        "p50/p95 de las vistas publicas y del admin (ver blog.benchmarks). "
+        "Falla si una vista supera su presupuesto de consultas o empeora "
+        "respecto de la linea base guardada. Usar sobre un corpus de "
+        "seed_corpus."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument(
+            "--baseline",
+            default=settings.BLOG_BENCHMARK_BASELINE,
+            help="Archivo JSON con la linea base.",
+        )
+        parser.add_argument(
+            "--save-baseline",
+            action="store_true",
+            help="Guardar los resultados como nueva linea base.",
+        )
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.25,
+            help="Regresion de p50 admitida respecto de la linea base.",
+        )
+        parser.add_argument("--only", nargs="*", help="Nombres de escenarios.")
+
+    def handle(self, *args, **options):
+        if options["iterations"] < 1:
+            raise CommandError("--iterations debe ser al menos 1")
+        path = Path(options["baseline"])
+        baseline = {}
+        if path.exists() and not options["save_baseline"]:
+            baseline = json.loads(path.read_text())
+
+        scenarios = [
+            scenario
+            for scenario in SCENARIOS
+            if not options["only"] or scenario.name in options["only"]
+        ]
+        self.stdout.write(
+            f"{'escenario':<18}{'consultas':>10}{'db ms':>9}{'tpl ms':>9}"
+            f"{'p50 ms':>9}{'p95 ms':>9}"
+        )
+        results = {}
+        failures = []
+        for scenario in scenarios:
+            measurement = measure(scenario, iterations=options["iterations"])
+            results[scenario.name] = measurement.as_dict()
+            problems = check(
+                measurement,
+                scenario,
+                baseline.get(scenario.name),
+                tolerance=options["tolerance"],
+            )
+            line = (
+                f"{scenario.name:<18}{measurement.queries:>10}"
+                f"{measurement.db_ms:>9.1f}{measurement.template_ms:>9.1f}"
+                f"{measurement.p50_ms:>9.1f}{measurement.p95_ms:>9.1f}"
+            )
+            if problems:
+                failures.append(f"{scenario.name}: {'; '.join(problems)}")
+                line = self.style.ERROR(line)
+            self.stdout.write(line)
+
+        if options["save_baseline"]:
+            path.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+            self.stdout.write(f"Linea base guardada en {path}")
+        if failures:
+            raise CommandError("\n".join(failures))
+        self.stdout.write(
+            self.style.SUCCESS("Todos los escenarios dentro del presupuesto")
+        )
@@ -0,0 +1,79 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Prefetch
+
+from blog.models import Category, Post
+from blog.transfer import FORMATS, RecordWriter, detect_format
+
+
+def to_record(post):
+    return {
+        "slug": post.slug,
+        "title": post.title,
+        "content": post.content,
+        "author": post.user.username,
+        "categories": [category.slug for category in post.categories.all()],
+        "status": post.status,
+        "publish_at": post.publish_at.isoformat(),
+        "deleted_at": post.deleted_at.isoformat() if post.deleted_at else None,
+        "is_featured": post.is_featured,
+        "image": post.image.name or None,
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Exporta los posts a JSONL o CSV (ver blog.transfer) leyendo con un "
+        "cursor del servidor; el resultado se puede cargar con import_posts."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path", nargs="?", default="-", help="Archivo o - (stdout)."
+        )
+        parser.add_argument("--format", choices=FORMATS)
+        parser.add_argument("--chunk-size", type=int, default=2000)
+        parser.add_argument(
+            "--include-deleted",
+            action="store_true",
+            help="Exportar tambien los posts eliminados.",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        fmt = options["format"] or detect_format(options["path"])
+        manager = Post.all_objects if options["include_deleted"] else Post.objects
+        posts = (
+            manager.select_related("user")
+            .defer("content_html", "excerpt", "image_meta")
+            .prefetch_related(
+                Prefetch("categories", queryset=Category.objects.only("slug"))
+            )
+            .order_by("pk")
+        )
+
+        if options["path"] == "-":
+            stream = sys.stdout
+            total = self.export(posts, stream, fmt, options["chunk_size"])
+        else:
+            with open(options["path"], "w", newline="", encoding="utf-8") as stream:
+                total = self.export(posts, stream, fmt, options["chunk_size"])
+
+        elapsed = time.perf_counter() - started
+        self.stderr.write(
+            self.style.SUCCESS(
+                f"{total} posts exportados en {elapsed:.1f}s "
+                f"({total / max(elapsed, 1e-6):.0f} filas/s)"
+            )
+        )
+
+    def export(self, posts, stream, fmt, chunk_size):
+        writer = RecordWriter(stream, fmt)
+        total = 0
+        # Con chunk_size, prefetch_related se resuelve por bloque de filas
+        for post in posts.iterator(chunk_size=chunk_size):
+            writer.write(to_record(post))
+            total += 1
+        return total
@@ -0,0 +1,268 @@
+import json
+import os
+import tempfile
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.models import Count, Max, Q, Sum
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+
+from blog.models import Author, Category, Post, RelatedPost
+from pages.models import Page
+
+MANIFEST_NAME = "manifest.json"
+# Atributos de las vistas que se desactivan al exportar: la cache de
+# respuestas y el conteo de visitas no aplican a un render offline.
+EXPORT_OVERRIDES = {"use_cache": False, "track_views": False}
+
+
+def write_atomic(path, content):
+    """Escribe en un temporal del mismo directorio y lo renombra."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def render_url(url):
+    match = resolve(urlsplit(url).path)
+    view_class = match.func.view_class
+    initkwargs = {
+        name: value
+        for name, value in EXPORT_OVERRIDES.items()
+        if hasattr(view_class, name)
+    }
+    request = RequestFactory().get(url)
+    request.user = AnonymousUser()
+    view = view_class.as_view(**initkwargs)
+    if view_class.view_is_async:
+        view = async_to_sync(view)
+    return view(request, *match.args, **match.kwargs)
+
+
+def export_target(output_dir, target):
+    """
+    Renderiza una URL (y sus paginas siguientes si es un listado) dentro de
+    `output_dir`. Se ejecuta en los procesos del pool.
+
+    La primera pagina se guarda como `<url>/index.html` y las siguientes
+    como `<url>/after-<cursor>.html`, que es el parametro ?after= de los
+    enlaces de paginacion.
+    """
+    files = []
+    after = None
+    while True:
+        url = target["url"] if after is None else f"{target['url']}?after={after}"
+        response = render_url(url)
+        if response.status_code != 200:
+            break
+        context = getattr(response, "context_data", None) or {}
+        page = context.get("page_obj")
+        if hasattr(response, "render"):
+            response.render()
+
+        name = "index.html" if after is None else f"after-{after}.html"
+        relative = os.path.join(target["url"].strip("/"), name)
+        write_atomic(os.path.join(output_dir, relative), response.content)
+        files.append(relative)
+
+        if page is None or not page.has_next():
+            break
+        after = page.next_cursor
+    return target["url"], files
+
+
+class Command(BaseCommand):
+    help = (
+        "Exporta el sitio publico a HTML estatico usando las vistas y "
+        "templates reales. Solo vuelve a renderizar las paginas cuyos datos "
+        "cambiaron desde la ultima exportacion (ver manifest.json). "
+        "Con nginx: try_files $uri/after-$arg_after.html $uri/index.html @django;"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            default=getattr(settings, "BLOG_EXPORT_DIR", settings.BASE_DIR / "export"),
+            help="Directorio de salida.",
+        )
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Ignorar el manifiesto y renderizar todo.",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        output = Path(options["output"])
+        manifest_path = output / MANIFEST_NAME
+        previous = {} if options["full"] else self.load_manifest(manifest_path)
+
+        targets = self.collect_targets()
+        pages = {}
+        pending = []
+        for target in targets:
+            entry = previous.get(target["url"])
+            if (
+                entry
+                and entry["stamp"] == target["stamp"]
+                and all((output / name).exists() for name in entry["files"])
+            ):
+                pages[target["url"]] = entry
+            else:
+                pending.append(target)
+
+        stamps = {target["url"]: target["stamp"] for target in pending}
+        # Los procesos hijos abren sus propias conexiones
+        connections.close_all()
+        render = partial(export_target, str(output))
+        if options["workers"] > 1 and len(pending) > 1:
+            with ProcessPoolExecutor(max_workers=options["workers"]) as pool:
+                results = list(pool.map(render, pending, chunksize=16))
+        else:
+            results = [render(target) for target in pending]
+        for url, files in results:
+            pages[url] = {"stamp": stamps[url], "files": files}
+
+        removed = self.remove_stale(output, previous, pages)
+        write_atomic(
+            manifest_path,
+            json.dumps({"pages": pages}, indent=1, sort_keys=True).encode(),
+        )
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(pending)} paginas renderizadas, "
+                f"{len(targets) - len(pending)} sin cambios, "
+                f"{removed} archivos eliminados en {elapsed:.1f}s"
+            )
+        )
+
+    def load_manifest(self, path):
+        try:
+            with open(path) as f:
+                return json.load(f)["pages"]
+        except (OSError, ValueError, KeyError):
+            return {}
+
+    def remove_stale(self, output, previous, pages):
+        current = {name for entry in pages.values() for name in entry["files"]}
+        removed = 0
+        for entry in previous.values():
+            for name in entry["files"]:
+                if name not in current and (output / name).exists():
+                    (output / name).unlink()
+                    removed += 1
+        return removed
+
+    def collect_targets(self):
+        """
+        Lista de URLs a exportar con el sello de sus datos de entrada:
+        si el sello no cambia, la pagina exportada sigue vigente.
+        """
+        # Elementos presentes en todas las paginas: pie de pagina y autor
+        footer = Page.objects.filter(is_active=True, show_in_footer=True).aggregate(
+            last=Max("updated"), total=Count("pk")
+        )
+        # La tarjeta del autor del sitio (home) muestra su contador, que
+        # cambia con un UPDATE sin tocar `updated`
+        site_author = (
+            Author.objects.filter(is_site_author=True)
+            .values_list("updated", "published_posts_count")
+            .first()
+        )
+        chrome = stamp(footer["last"], footer["total"], site_author)
+
+        published = Post.objects.published()
+        overall = Post.all_objects.aggregate(
+            last=Max("updated"),
+            total=Count("pk", filter=Q(deleted_at__isnull=True, is_live=True)),
+        )
+        popularity = published.aggregate(total=Sum("popularity"))["total"]
+        categories_last = Category.objects.aggregate(last=Max("updated"))["last"]
+        listing = stamp(
+            chrome, overall["last"], overall["total"], popularity, categories_last
+        )
+        targets = [
+            {"url": reverse("home"), "stamp": listing},
+            {"url": reverse("blog:list_posts"), "stamp": listing},
+        ]
+
+        # El detalle muestra la tarjeta de su autor (con su contador) y las
+        # tarjetas de relacionados, como en DetailPostView.get_validators
+        related = defaultdict(list)
+        rows = RelatedPost.objects.order_by("post_id", "position").values_list(
+            "post_id", "related_id", "related__updated"
+        )
+        for post_id, *neighbour in rows.iterator(chunk_size=2000):
+            related[post_id].append(neighbour)
+
+        posts = published.values_list(
+            "pk",
+            "slug",
+            "updated",
+            "user__author_profile__updated",
+            "user__author_profile__published_posts_count",
+        ).order_by()
+        for pk, slug, *post in posts.iterator(chunk_size=2000):
+            targets.append(
+                {
+                    "url": reverse("blog:detail_post", kwargs={"slug": slug}),
+                    "stamp": stamp(chrome, *post, related[pk]),
+                }
+            )
+
+        categories = (
+            Category.objects.exclude(slug=None)
+            .annotate(last=Max("posts__updated"))
+            .values_list("slug", "updated", "last", "published_posts_count")
+        )
+        for slug, updated, last, count in categories:
+            targets.append(
+                {
+                    "url": reverse("blog:detail_category", kwargs={"slug": slug}),
+                    "stamp": stamp(chrome, updated, last, count),
+                }
+            )
+
+        authors = Author.objects.annotate(last=Max("user__post__updated")).values_list(
+            "pk", "updated", "last", "published_posts_count"
+        )
+        for pk, updated, last, count in authors:
+            targets.append(
+                {
+                    "url": reverse("blog:author_detail", kwargs={"pk": pk}),
+                    "stamp": stamp(chrome, updated, last, count),
+                }
+            )
+
+        for slug, updated in Page.objects.values_list("slug", "updated"):
+            targets.append(
+                {
+                    "url": reverse("pages:page_detail", kwargs={"slug": slug}),
+                    "stamp": stamp(chrome, updated),
+                }
+            )
+        return targets
+
+
+def stamp(*parts):
+    return "|".join("" if part is None else str(part) for part in parts)
@@ -0,0 +1,127 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from blog.images import IMAGE_FIELDS, delete_variants, generate_variants
+from blog.models import Author, Post
+from core.cache import bump_version
+
+
+def process_one(item):
+    """Procesa (pk, nombre); retorna (pk, meta o None, error)."""
+    pk, name = item
+    try:
+        return pk, generate_variants(name), None
+    except Exception as exc:  # un archivo roto no detiene el resto
+        return pk, None, f"{name}: {exc}"
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera las variantes WebP/JPEG de Post.image y Author.avatar que "
+        "falten (o todas con --force) usando un pool de procesos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Procesos del pool (1 procesa en este proceso).",
+        )
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Regenerar tambien las imagenes ya procesadas.",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        total = errors = 0
+        for model in (Post, Author):
+            for field_name in IMAGE_FIELDS:
+                if not hasattr(model, field_name):
+                    continue
+                done, failed = self.process(model, field_name, options)
+                total += done
+                errors += failed
+
+        if total:
+            from blog.signals import CONTENT_VERSION
+
+            bump_version(CONTENT_VERSION)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{total} imagenes procesadas, {errors} errores en {elapsed:.1f}s"
+            )
+        )
+
+    def pending(self, model, field_name, force, batch_size):
+        """
+        Genera lotes de (pk, nombre, meta) pendientes, con una consulta por
+        lote paginada por pk: la memoria no crece con la cantidad de filas.
+        """
+        meta_field = IMAGE_FIELDS[field_name]
+        rows = (
+            model._base_manager.exclude(Q(**{field_name: ""}) | Q(**{field_name: None}))
+            .values_list("pk", field_name, meta_field)
+            .order_by("pk")
+        )
+        last = None
+        while True:
+            chunk = rows if last is None else rows.filter(pk__gt=last)
+            chunk = list(chunk[:batch_size])
+            if not chunk:
+                return
+            last = chunk[-1][0]
+            yield [
+                (pk, name, meta)
+                for pk, name, meta in chunk
+                if force or (meta or {}).get("source") != name
+            ]
+
+    def process(self, model, field_name, options):
+        done = failed = 0
+        with ExitStack() as stack:
+            pool = None
+            batches = self.pending(
+                model, field_name, options["force"], options["batch_size"]
+            )
+            for items in batches:
+                work = [(pk, name) for pk, name, _ in items]
+                if options["workers"] > 1 and len(work) > 1:
+                    if pool is None:
+                        pool = stack.enter_context(
+                            ProcessPoolExecutor(max_workers=options["workers"])
+                        )
+                    results = pool.map(process_one, work, chunksize=4)
+                else:
+                    results = map(process_one, work)
+                stored, errors = self.store(model, field_name, items, results)
+                done += stored
+                failed += errors
+        return done, failed
+
+    def store(self, model, field_name, items, results):
+        meta_field = IMAGE_FIELDS[field_name]
+        previous = {pk: meta for pk, _, meta in items}
+        now = timezone.now()
+        objects = []
+        failed = 0
+        for pk, meta, error in results:
+            if error:
+                failed += 1
+                self.stderr.write(error)
+                continue
+            delete_variants(previous[pk], keep=meta)
+            objects.append(model(pk=pk, **{meta_field: meta, "updated": now}))
+        # bulk_update no dispara señales: no se vuelve a encolar el proceso.
+        model._base_manager.bulk_update(objects, [meta_field, "updated"])
+        return len(objects), failed
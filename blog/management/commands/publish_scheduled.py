@@ -0,0 +1,56 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        "Marca como visibles (is_live) los posts programados cuya fecha de "
+        "publicacion ya paso. Con --loop queda corriendo como worker."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="No terminar: esperar al siguiente post programado.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=getattr(settings, "BLOG_SCHEDULER_INTERVAL", 60),
+            help="Espera maxima en segundos entre revisiones con --loop.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            published = self.publish_due()
+            if published:
+                self.stdout.write(f"{published} posts publicados")
+            if not options["loop"]:
+                break
+            self.sleep(options["interval"])
+
+    def publish_due(self):
+        count = 0
+        for post in Post.objects.due().iterator():
+            # Un save normal: mismas señales (contadores, cache, indices)
+            # que una publicacion manual desde el admin. `updated` cambia
+            # para Last-Modified, export_static y los fragmentos cacheados.
+            post.save(update_fields=["is_live", "updated"])
+            count += 1
+        return count
+
+    def sleep(self, interval):
+        close_old_connections()
+        next_change = Post.objects.next_scheduled_change()
+        delay = interval
+        if next_change is not None:
+            until = (next_change - timezone.now()).total_seconds()
+            delay = min(interval, max(until, 0))
+        time.sleep(delay)
@@ -0,0 +1,63 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from blog.retention import archive_batch, expired_posts, get_cutoff
+
+
+class Command(BaseCommand):
+    help = (
+        "Mueve a PostArchive los posts eliminados hace mas de "
+        "BLOG_DELETED_RETENTION_DAYS, con sus categorias, en lotes de una "
+        "transaccion cada uno. Con --loop queda corriendo como worker."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=float,
+            default=None,
+            help="Dias desde la eliminacion (por defecto la configuracion).",
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Solo contar los posts que se archivarian.",
+        )
+        parser.add_argument("--loop", action="store_true")
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=getattr(settings, "BLOG_PURGE_INTERVAL", 3600),
+            help="Segundos entre pasadas con --loop.",
+        )
+
+    def handle(self, *args, **options):
+        self.verbosity = options["verbosity"]
+        while True:
+            cutoff = get_cutoff(options["days"])
+            if options["dry_run"]:
+                count = expired_posts(cutoff).count()
+                self.stdout.write(f"{count} posts se archivarian")
+                return
+            self.purge(cutoff, options["batch_size"])
+            if not options["loop"]:
+                break
+            close_old_connections()
+            time.sleep(options["interval"])
+
+    def purge(self, cutoff, batch_size):
+        started = time.perf_counter()
+        total = 0
+        while archived := archive_batch(cutoff, batch_size):
+            total += archived
+            if self.verbosity > 1:
+                self.stdout.write(f"  {total} archivados")
+        if total:
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                self.style.SUCCESS(f"{total} posts archivados en {elapsed:.1f}s")
+            )
@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.related import CHUNK_SIZE, rebuild
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula desde cero los posts relacionados (RelatedPost) de todos "
+        "los posts visibles. Las señales los mantienen al dia; sirve para "
+        "cargas masivas y para corregir el orden de los empates."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        count = rebuild(batch_size=options["batch_size"])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(f"Relacionados de {count} posts en {elapsed:.1f}s")
+        )
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.models import Post
+from blog.search import get_backend
+
+
+class Command(BaseCommand):
+    help = "Reconstruye el indice de busqueda de posts desde cero."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        backend = get_backend()
+        if backend is None:
+            raise CommandError("No hay motor de busqueda para esta base de datos")
+        count = backend.rebuild(Post.objects.all(), batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"{count} posts indexados"))
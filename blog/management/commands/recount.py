@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from blog.signals import (
+    CONTENT_VERSION,
+    SITE_AUTHOR_VERSION,
+    recount_month_counters,
+    recount_published_counters,
+)
+from core.cache import bump_version
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula published_posts_count de autores, categorias y meses "
+        "(PostMonth) con una sola consulta agregada por tabla."
+    )
+
+    def handle(self, *args, **options):
+        authors, categories = recount_published_counters()
+        months = recount_month_counters()
+        bump_version(CONTENT_VERSION)
+        bump_version(SITE_AUTHOR_VERSION)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Contadores recalculados: {authors} autores, "
+                f"{categories} categorias, {months} meses"
+            )
+        )
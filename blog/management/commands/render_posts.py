@@ -0,0 +1,88 @@
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.models import RENDERED_FIELDS, Post
+from blog.rendering import render_many
+from blog.signals import CONTENT_VERSION
+from core.cache import bump_version
+
+
+class Command(BaseCommand):
+    help = (
+        "Vuelve a renderizar content_html, excerpt, word_count y reading_time "
+        "de todos los posts usando un pool de procesos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Procesos del pool (1 renderiza en este proceso).",
+        )
+        parser.add_argument("--batch-size", type=int, default=200)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        batches = self.batches(options["batch_size"])
+        total = 0
+
+        if options["workers"] > 1:
+            total = self.render_in_pool(batches, options["workers"])
+        else:
+            for batch in batches:
+                total += self.save(render_many(batch))
+
+        if total:
+            # bulk_update no dispara señales: paginas y fragmentos cacheados
+            bump_version(CONTENT_VERSION)
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(f"{total} posts renderizados en {elapsed:.1f}s")
+        )
+
+    def render_in_pool(self, batches, workers):
+        """
+        Renderiza los lotes en el pool con como mucho 2 por proceso en
+        vuelo: el cursor se lee a medida que el pool avanza, en lugar de
+        encolar todos los lotes de una vez como hace pool.map.
+        """
+        total = 0
+        pending = set()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for batch in batches:
+                if len(pending) >= 2 * workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    total += sum(self.save(future.result()) for future in done)
+                pending.add(pool.submit(render_many, batch))
+            for future in pending:
+                total += self.save(future.result())
+        return total
+
+    def batches(self, size):
+        """Genera lotes de (pk, content) leyendo con un cursor del servidor."""
+        batch = []
+        rows = Post.all_objects.values_list("pk", "content").order_by("pk")
+        for row in rows.iterator(chunk_size=size):
+            batch.append(row)
+            if len(batch) == size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def save(self, rendered):
+        now = timezone.now()
+        posts = []
+        for pk, fields in rendered:
+            post = Post(pk=pk, updated=now, **fields)
+            posts.append(post)
+        # bulk_update no dispara señales: `updated` se asigna aqui para los
+        # validadores, los fragmentos cacheados y export_static.
+        Post.all_objects.bulk_update(posts, [*RENDERED_FIELDS, "updated"])
+        return len(posts)
@@ -0,0 +1,246 @@
+import random
+import secrets
+import time
+from datetime import timedelta
+from itertools import islice
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from blog.models import Author, Category, Post
+from blog.rendering import render_content
+from blog.search import get_backend
+from blog.signals import CONTENT_VERSION
+from core.cache import bump_version
+from pages.models import Page
+from pages.signals import FOOTER_VERSION, PAGES_VERSION
+
+WORDS = (
+    "django python datos consulta indice cache plantilla servidor modelo vista "
+    "rendimiento memoria proceso latencia usuario contenido busqueda pagina "
+    "categoria autor despliegue prueba error registro tabla columna cursor "
+    "lote cola hilo red archivo imagen formato texto codigo funcion clase"
+).split()
+# Contenidos distintos que se renderizan una vez y se reparten entre posts
+DISTINCT_BODIES = 200
+
+
+def weighted_choices(population, count, rng, exponent=1.1):
+    """Elige con una distribucion tipo Zipf: pocos elementos muy frecuentes."""
+    weights = [1 / (rank**exponent) for rank in range(1, len(population) + 1)]
+    return rng.choices(population, weights=weights, k=count)
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera un corpus sintetico (usuarios, autores, categorias, posts y "
+        "paginas) para el comando benchmark. Los autores y categorias siguen "
+        "una distribucion de Zipf y cada post tiene varias categorias."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=200)
+        parser.add_argument("--authors", type=int, default=50)
+        parser.add_argument("--categories", type=int, default=40)
+        parser.add_argument("--posts", type=int, default=5000)
+        parser.add_argument("--pages", type=int, default=10)
+        parser.add_argument(
+            "--max-categories",
+            type=int,
+            default=5,
+            help="Maximo de categorias por post.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--seed", type=int, default=None)
+        parser.add_argument(
+            "--no-reindex",
+            action="store_true",
+            help="No reconstruir el indice de busqueda al terminar.",
+        )
+
+    def handle(self, *args, **options):
+        if options["authors"] < 1 or options["authors"] > options["users"]:
+            raise CommandError("--authors debe estar entre 1 y --users")
+        started = time.perf_counter()
+        self.rng = random.Random(options["seed"])
+        # Prefijo de la corrida: se puede sembrar varias veces la misma base
+        self.run = secrets.token_hex(3)
+        batch_size = options["batch_size"]
+
+        with transaction.atomic():
+            user_ids = self.create_users(options["users"], batch_size)
+            author_user_ids = self.create_authors(user_ids[: options["authors"]])
+            category_ids = self.create_categories(options["categories"])
+            self.create_pages(options["pages"])
+        total = self.create_posts(
+            options["posts"],
+            author_user_ids,
+            category_ids,
+            options["max_categories"],
+            batch_size,
+        )
+
+        call_command("recount", stdout=self.stdout)
+        call_command("rebuild_related", stdout=self.stdout)
+        if not options["no_reindex"] and get_backend() is not None:
+            call_command("rebuild_search_index", stdout=self.stdout)
+        bump_version(CONTENT_VERSION)
+        bump_version(FOOTER_VERSION)
+        bump_version(PAGES_VERSION)
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(user_ids)} usuarios, {len(author_user_ids)} autores, "
+                f"{len(category_ids)} categorias y {total} posts en {elapsed:.1f}s"
+            )
+        )
+
+    def words(self, count):
+        return " ".join(self.rng.choices(WORDS, k=count))
+
+    def create_users(self, count, batch_size):
+        users = []
+        for i in range(count):
+            user = User(
+                username=f"seed-{self.run}-{i}",
+                first_name=self.words(1).title(),
+                last_name=self.words(1).title(),
+            )
+            user.set_unusable_password()
+            users.append(user)
+        User.objects.bulk_create(users, batch_size=batch_size)
+        return list(
+            User.objects.filter(username__startswith=f"seed-{self.run}-")
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+
+    def create_authors(self, user_ids):
+        has_site_author = Author.objects.filter(is_site_author=True).exists()
+        Author.objects.bulk_create(
+            [
+                Author(
+                    user_id=user_id,
+                    bio=self.words(25).capitalize(),
+                    github=f"seed{user_id}",
+                    is_site_author=not has_site_author and i == 0,
+                )
+                for i, user_id in enumerate(user_ids)
+            ]
+        )
+        return user_ids
+
+    def create_categories(self, count):
+        Category.objects.bulk_create(
+            [
+                Category(
+                    name=f"{self.words(1).title()} {i}", slug=f"seed-{self.run}-{i}"
+                )
+                for i in range(count)
+            ]
+        )
+        return list(
+            Category.objects.filter(slug__startswith=f"seed-{self.run}-")
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+
+    def create_pages(self, count):
+        Page.objects.bulk_create(
+            [
+                Page(
+                    title=self.words(2).title(),
+                    slug=f"seed-{self.run}-{i}",
+                    content=self.words(150),
+                    show_in_footer=i < 4,
+                )
+                for i in range(count)
+            ]
+        )
+
+    def body(self):
+        paragraphs = [f"## {self.words(4).capitalize()}"]
+        for _ in range(self.rng.randint(3, 12)):
+            paragraphs.append(
+                f"{self.words(self.rng.randint(30, 120)).capitalize()} "
+                f"**{self.words(2)}** `{self.rng.choice(WORDS)}`."
+            )
+        return "\n\n".join(paragraphs)
+
+    def build_post(self, i, user_id, bodies, now):
+        roll = self.rng.random()
+        status = Post.Status.PUBLISHED
+        publish_at = now - timedelta(minutes=self.rng.randint(1, 3 * 365 * 24 * 60))
+        deleted_at = None
+        if roll < 0.07:
+            status = Post.Status.DRAFT
+        elif roll < 0.10:
+            status = Post.Status.DELETED
+            deleted_at = now
+        elif roll < 0.13:
+            publish_at = now + timedelta(days=self.rng.randint(1, 30))
+
+        content, rendered = self.rng.choice(bodies)
+        post = Post(
+            title=self.words(self.rng.randint(3, 6)).capitalize()[:60],
+            slug=f"seed-{self.run}-{i}",
+            content=content,
+            user_id=user_id,
+            status=status,
+            publish_at=publish_at,
+            deleted_at=deleted_at,
+            is_featured=self.rng.random() < 0.01,
+            popularity=self.rng.expovariate(0.1) if status == "published" else 0,
+            **rendered,
+        )
+        post.is_live = post.compute_is_live()
+        return post
+
+    def create_posts(self, count, author_user_ids, category_ids, max_categories, size):
+        bodies = []
+        for _ in range(DISTINCT_BODIES):
+            content = self.body()
+            bodies.append((content, render_content(content)))
+        now = timezone.now()
+        owners = weighted_choices(author_user_ids, count, self.rng)
+        Through = Post.categories.through
+        total = 0
+
+        for batch in batched(enumerate(owners), size):
+            with transaction.atomic():
+                posts = Post.all_objects.bulk_create(
+                    [self.build_post(i, user_id, bodies, now) for i, user_id in batch]
+                )
+                if posts and posts[0].pk is None:
+                    slugs = [post.slug for post in posts]
+                    ids = dict(
+                        Post.all_objects.filter(slug__in=slugs).values_list("slug", "pk")
+                    )
+                    for post in posts:
+                        post.pk = ids[post.slug]
+
+                rows = []
+                for post in posts:
+                    fan_out = min(
+                        1 + int(self.rng.expovariate(1.0)),
+                        max_categories,
+                        len(category_ids),
+                    )
+                    chosen = set(weighted_choices(category_ids, fan_out, self.rng))
+                    rows.extend(
+                        Through(post_id=post.pk, category_id=category_id)
+                        for category_id in chosen
+                    )
+                Through.objects.bulk_create(rows, batch_size=size)
+            total += len(posts)
+        return total
@@ -0,0 +1,60 @@
+import sqlite3
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from core.routers import get_replicas
+
+
+class Command(BaseCommand):
+    help = (
+        "Copia la base principal SQLite sobre las replicas de "
+        "DATABASE_REPLICAS (prueba local de core.routers). Con --loop "
+        "repite la copia cada --interval segundos, simulando el atraso de "
+        "una replica real."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", action="store_true")
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=2.0,
+            help="Segundos entre copias con --loop.",
+        )
+
+    def handle(self, *args, **options):
+        primary = connections[DEFAULT_DB_ALIAS].settings_dict
+        replicas = [connections[alias].settings_dict for alias in get_replicas()]
+        for settings_dict in [primary, *replicas]:
+            if settings_dict["ENGINE"] != "django.db.backends.sqlite3":
+                raise CommandError(
+                    "Solo SQLite: las replicas reales se sincronizan con la "
+                    "replicacion del motor de base de datos"
+                )
+        if not replicas:
+            raise CommandError("DATABASE_REPLICAS esta vacio (ver SQLITE_REPLICAS)")
+
+        while True:
+            started = time.perf_counter()
+            for alias, settings_dict in zip(get_replicas(), replicas):
+                self.copy(primary["NAME"], settings_dict["NAME"])
+                connections[alias].close()
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                self.style.SUCCESS(f"{len(replicas)} replicas copiadas en {elapsed:.2f}s")
+            )
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
+
+    @staticmethod
+    def copy(source, target):
+        # La API de backup copia de forma consistente aunque haya escrituras
+        src, dst = sqlite3.connect(source), sqlite3.connect(target)
+        try:
+            src.backup(dst)
+        finally:
+            dst.close()
+            src.close()
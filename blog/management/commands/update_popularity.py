@@ -0,0 +1,93 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from blog.models import Post, PostDailyViews
+from blog.signals import CONTENT_VERSION
+from core.cache import bump_version
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula Post.popularity a partir de PostDailyViews con decaimiento "
+        "exponencial y compacta las filas de dias anteriores."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--window",
+            type=int,
+            default=getattr(settings, "BLOG_POPULARITY_WINDOW_DAYS", 30),
+            help="Dias de visitas que se toman en cuenta.",
+        )
+        parser.add_argument(
+            "--half-life",
+            type=float,
+            default=getattr(settings, "BLOG_POPULARITY_HALF_LIFE_DAYS", 7),
+            help="Dias en los que el peso de una visita se reduce a la mitad.",
+        )
+
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+        since = today - timedelta(days=options["window"])
+
+        PostDailyViews.objects.filter(day__lt=since).delete()
+        self.compact(since, today)
+
+        scores = defaultdict(float)
+        rows = (
+            PostDailyViews.objects.filter(day__gte=since)
+            .values_list("post_id", "day")
+            .annotate(total=Sum("hits"))
+            .order_by()
+        )
+        for post_id, day, total in rows:
+            age = (today - day).days
+            scores[post_id] += total * 0.5 ** (age / options["half_life"])
+
+        posts = list(Post.all_objects.filter(pk__in=scores).only("popularity"))
+        for post in posts:
+            post.popularity = round(scores[post.pk], 4)
+        # bulk_update no dispara señales ni toca `updated`.
+        Post.all_objects.bulk_update(posts, ["popularity"], batch_size=500)
+        Post.all_objects.exclude(pk__in=scores).exclude(popularity=0).update(
+            popularity=0
+        )
+        # Las listas de populares cambian sin pasar por post_save.
+        bump_version(CONTENT_VERSION)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Popularidad recalculada para {len(posts)} posts")
+        )
+
+    def compact(self, since, until):
+        """
+        Fusiona en una sola fila las visitas de cada (post, dia) ya cerrado,
+        de `since` a `until` sin incluirlo (hoy sigue recibiendo visitas).
+        """
+        closed = PostDailyViews.objects.filter(day__gte=since, day__lt=until)
+        with transaction.atomic():
+            totals = list(
+                closed.values_list("post_id", "day")
+                .annotate(total=Sum("hits"), rows=Count("id"))
+                .filter(rows__gt=1)
+                .order_by()
+                .values_list("post_id", "day", "total")
+            )
+            by_day = defaultdict(list)
+            for post_id, day, _total in totals:
+                by_day[day].append(post_id)
+            for day, post_ids in by_day.items():
+                closed.filter(day=day, post_id__in=post_ids).delete()
+            PostDailyViews.objects.bulk_create(
+                [
+                    PostDailyViews(post_id=post_id, day=day, hits=total)
+                    for post_id, day, total in totals
+                ],
+                batch_size=500,
+            )
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.9 on 2026-10-18 18:37
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_post_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostDailyViews',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='Dia')),
+                ('hits', models.PositiveIntegerField(default=0, verbose_name='Visitas')),
+            ],
+            options={
+                'verbose_name': 'Visitas diarias',
+                'verbose_name_plural': 'Visitas diarias',
+            },
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='popularity',
+            field=models.FloatField(default=0, editable=False, help_text='Visitas con decaimiento temporal, ver update_popularity', verbose_name='Popularidad'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['status', '-popularity', '-created'], name='post_popular_idx'),
+        ),
+        migrations.AddField(
+            model_name='postdailyviews',
+            name='post',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_views', to='blog.post'),
+        ),
+        migrations.AddIndex(
+            model_name='postdailyviews',
+            index=models.Index(fields=['day', 'post'], name='post_views_day_idx'),
+        ),
+    ]
@@ -0,0 +1,50 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE blog_post_fts USING fts5("
+            "title, content, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(
+            "INSERT INTO blog_post_fts (rowid, title, content) "
+            "SELECT id, title, content FROM blog_post WHERE deleted_at IS NULL"
+        )
+    elif vendor == "postgresql":
+        schema_editor.execute(
+            "CREATE TABLE blog_post_search ("
+            "post_id bigint PRIMARY KEY REFERENCES blog_post (id) "
+            "ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+            "document tsvector NOT NULL)"
+        )
+        schema_editor.execute(
+            "CREATE INDEX blog_post_search_document_idx "
+            "ON blog_post_search USING GIN (document)"
+        )
+        schema_editor.execute(
+            "INSERT INTO blog_post_search (post_id, document) "
+            "SELECT id, setweight(to_tsvector('spanish', title), 'A') "
+            "|| setweight(to_tsvector('spanish', content), 'B') "
+            "FROM blog_post WHERE deleted_at IS NULL"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        schema_editor.execute("DROP TABLE IF EXISTS blog_post_fts")
+    elif vendor == "postgresql":
+        schema_editor.execute("DROP TABLE IF EXISTS blog_post_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0014_post_keyset_index"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
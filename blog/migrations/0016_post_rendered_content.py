@@ -0,0 +1,55 @@
+# Generated by Django 5.2.9 on 2026-10-18 18:43
+
+from django.db import migrations, models
+
+from blog.rendering import render_content
+
+
+def render_existing_posts(apps, schema_editor):
+    Post = apps.get_model("blog", "Post")
+    fields = ["content_html", "excerpt", "word_count", "reading_time"]
+    batch = []
+    for post in Post.objects.only("content").iterator(chunk_size=500):
+        for field, value in render_content(post.content).items():
+            setattr(post, field, value)
+        batch.append(post)
+        if len(batch) == 500:
+            Post.objects.bulk_update(batch, fields)
+            batch = []
+    Post.objects.bulk_update(batch, fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0015_post_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='content_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.CharField(blank=True, editable=False, max_length=300),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='reading_time',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='Minutos de lectura'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='content',
+            field=models.TextField(help_text='Markdown', verbose_name='Contenido'),
+        ),
+        migrations.RunPython(render_existing_posts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.9 on 2026-10-18 18:44
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+def count_published_posts(apps, schema_editor):
+    Post = apps.get_model("blog", "Post")
+    Author = apps.get_model("blog", "Author")
+    Category = apps.get_model("blog", "Category")
+    published = Post.objects.filter(
+        deleted_at__isnull=True, status="published", publish_at__lte=timezone.now()
+    ).order_by()
+    Author.objects.update(
+        published_posts_count=Coalesce(
+            Subquery(
+                published.filter(user_id=OuterRef("user_id"))
+                .values("user_id")
+                .annotate(total=Count("pk"))
+                .values("total")
+            ),
+            0,
+        )
+    )
+    Category.objects.update(
+        published_posts_count=Coalesce(
+            Subquery(
+                published.filter(categories=OuterRef("pk"))
+                .values("categories")
+                .annotate(total=Count("pk"))
+                .values("total")
+            ),
+            0,
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0016_post_rendered_content'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='author',
+            name='published_posts_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Posts publicados'),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='published_posts_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Posts publicados'),
+        ),
+        migrations.RunPython(count_published_posts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.9 on 2026-10-18 18:45
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def set_is_live(apps, schema_editor):
+    Post = apps.get_model("blog", "Post")
+    Post.objects.filter(
+        deleted_at__isnull=True, status="published", publish_at__lte=timezone.now()
+    ).update(is_live=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0017_published_posts_count'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_featured_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_popular_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_alive_publish_idx',
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='is_live',
+            field=models.BooleanField(default=False, editable=False, help_text='Publicado y con fecha de publicacion alcanzada', verbose_name='Visible'),
+        ),
+        migrations.RunPython(set_is_live, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True), ('is_live', True)), fields=['-publish_at', '-id'], name='post_live_publish_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True), ('is_live', True)), fields=['-popularity', '-created'], name='post_popular_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True), ('is_featured', True), ('is_live', True)), fields=['-publish_at', '-id'], name='post_featured_idx'),
+        ),
+    ]
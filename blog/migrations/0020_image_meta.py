@@ -0,0 +1,23 @@
+# Generated by Django 5.2.9 on 2026-10-18 18:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0019_post_live_updated_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='author',
+            name='avatar_meta',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='image_meta',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.9 on 2026-10-18 19:12
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0020_image_meta'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostArchive',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='Id original')),
+                ('title', models.CharField(max_length=60, verbose_name='Titulo')),
+                ('slug', models.SlugField()),
+                ('content', models.TextField(verbose_name='Contenido')),
+                ('category_ids', models.JSONField(default=list, verbose_name='Categorias')),
+                ('image', models.CharField(blank=True, max_length=100, verbose_name='Imagen')),
+                ('image_meta', models.JSONField(blank=True, default=dict)),
+                ('status', models.CharField(choices=[('draft', 'Borrador'), ('published', 'Publicado'), ('archived', 'Archivado'), ('deleted', 'Eliminado')], max_length=10)),
+                ('publish_at', models.DateTimeField(verbose_name='Fecha de publicacion')),
+                ('deleted_at', models.DateTimeField(verbose_name='Fecha de eliminacion')),
+                ('is_featured', models.BooleanField(default=False)),
+                ('popularity', models.FloatField(default=0)),
+                ('created', models.DateTimeField(verbose_name='Fecha de creacion')),
+                ('updated', models.DateTimeField(verbose_name='Fecha de modificacion')),
+                ('archived_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de archivo')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Autor')),
+            ],
+            options={
+                'verbose_name': 'Publicacion archivada',
+                'verbose_name_plural': 'Publicaciones archivadas',
+                'ordering': ['-deleted_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 5.2.9 on 2026-10-18 19:17
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F, Window
+from django.db.models.functions import RowNumber
+
+
+def build_related_posts(apps, schema_editor):
+    # Igual que blog.related.rebuild, con los modelos historicos
+    Post = apps.get_model("blog", "Post")
+    RelatedPost = apps.get_model("blog", "RelatedPost")
+    Through = Post.categories.through
+    limit = getattr(settings, "BLOG_RELATED_POSTS", 4)
+    ids = list(
+        Post.objects.filter(is_live=True).order_by("pk").values_list("pk", flat=True)
+    )
+    for start in range(0, len(ids), 500):
+        rows = (
+            Through.objects.filter(
+                post_id__in=ids[start : start + 500], category__posts__is_live=True
+            )
+            .annotate(other=F("category__posts"))
+            .exclude(other=F("post_id"))
+            .values_list("post_id", "other")
+            .annotate(score=Count("category"))
+            .order_by()
+            .annotate(
+                rank=Window(
+                    RowNumber(),
+                    partition_by=F("post_id"),
+                    order_by=[F("score").desc(), F("other").desc()],
+                )
+            )
+            .filter(rank__lte=limit)
+            .values_list("post_id", "other", "score", "rank")
+        )
+        RelatedPost.objects.bulk_create(
+            [
+                RelatedPost(
+                    post_id=post_id, related_id=other, score=score, position=rank - 1
+                )
+                for post_id, other, score, rank in rows
+            ]
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0021_post_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedPost',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveSmallIntegerField(verbose_name='Posicion')),
+                ('score', models.PositiveSmallIntegerField(verbose_name='Categorias en comun')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_links', to='blog.post')),
+                ('related', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='blog.post')),
+            ],
+            options={
+                'verbose_name': 'Post relacionado',
+                'verbose_name_plural': 'Posts relacionados',
+                'ordering': ['post', 'position'],
+                'constraints': [models.UniqueConstraint(fields=('post', 'position'), name='related_post_position_uniq')],
+            },
+        ),
+        migrations.RunPython(build_related_posts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.9 on 2026-10-18 19:20
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+
+def count_posts_by_month(apps, schema_editor):
+    # Igual que blog.signals.recount_month_counters: meses en la zona
+    # horaria local, con los modelos historicos
+    Post = apps.get_model("blog", "Post")
+    PostMonth = apps.get_model("blog", "PostMonth")
+    rows = (
+        Post.objects.filter(deleted_at__isnull=True, is_live=True)
+        .order_by()
+        .annotate(year=ExtractYear("publish_at"), month=ExtractMonth("publish_at"))
+        .values("year", "month")
+        .annotate(total=Count("pk"))
+    )
+    PostMonth.objects.bulk_create(
+        [
+            PostMonth(
+                year=row["year"], month=row["month"], published_posts_count=row["total"]
+            )
+            for row in rows
+        ]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0022_related_post'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostMonth',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField(verbose_name='Año')),
+                ('month', models.PositiveSmallIntegerField(verbose_name='Mes')),
+                ('published_posts_count', models.PositiveIntegerField(default=0, editable=False, verbose_name='Posts publicados')),
+            ],
+            options={
+                'verbose_name': 'Mes de publicacion',
+                'verbose_name_plural': 'Meses de publicacion',
+                'ordering': ['-year', '-month'],
+                'constraints': [models.UniqueConstraint(fields=('year', 'month'), name='post_month_uniq')],
+            },
+        ),
+        migrations.RunPython(count_posts_by_month, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.9 on 2026-10-18 19:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0023_post_month'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='revision',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Numero de la ultima PostRevision', verbose_name='Revision'),
+        ),
+        migrations.CreateModel(
+            name='PostRevision',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.PositiveIntegerField(verbose_name='Revision')),
+                ('title', models.CharField(max_length=60, verbose_name='Titulo')),
+                ('is_keyframe', models.BooleanField(default=False, verbose_name='Completa')),
+                ('data', models.BinaryField()),
+                ('category_ids', models.JSONField(blank=True, null=True, verbose_name='Categorias')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Fecha')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='revisions', to='blog.post')),
+            ],
+            options={
+                'verbose_name': 'Revision',
+                'verbose_name_plural': 'Revisiones',
+                'ordering': ['post', '-number'],
+                'constraints': [models.UniqueConstraint(fields=('post', 'number'), name='post_revision_number_uniq')],
+            },
+        ),
+    ]
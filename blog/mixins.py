@@ -0,0 +1,192 @@
+import asyncio
+import math
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import InvalidPage
+from django.http import Http404, HttpResponse
+from django.utils import timezone
+
+from core.cache import aget_version, get_version
+from core.routers import bound_timeout
+from pages.processors import aget_footer_pages
+from pages.signals import FOOTER_VERSION
+
+from .models import Post
+from .pagination import KeysetPaginator
+from .processors import aget_site_author
+from .signals import CONTENT_VERSION, SITE_AUTHOR_VERSION
+
+# Versiones de lo que base.html muestra en todas las paginas
+LAYOUT_VERSIONS = (SITE_AUTHOR_VERSION, FOOTER_VERSION)
+
+
+def layout_queries():
+    """
+    Consultas (cacheadas) de los context processors de base.html, para
+    resolverlas en las vistas async junto con las suyas (gather_queries).
+    Los valores del contexto de la vista tapan los de los processors.
+    """
+    return {"site_author": aget_site_author(), "footer_pages": aget_footer_pages()}
+
+
+class CachedResponseMixin:
+    """
+    Guarda en cache la respuesta renderizada de la vista.
+
+    La clave incluye la version de contenido del blog, que se incrementa con
+    las señales de Post/Category/Author; un hit no toca la base de datos.
+    Solo se cachean GET sin parametros (por ejemplo, la pagina 1 de un listado).
+    Las respuestas streaming se guardan al terminar de enviarse.
+
+    Funciona con vistas sincronas y async; en las async la cache se consulta
+    con la API async y el render se hace en un hilo.
+    """
+
+    cache_versions = (CONTENT_VERSION, *LAYOUT_VERSIONS)
+    use_cache = True
+
+    def get_cache_timeout(self):
+        """
+        Sin limite entre eventos; si hay un post programado, la entrada
+        expira justo cuando deberia aparecer. Si la pagina se leyo de una
+        replica dura como maximo la ventana de core.routers.
+        """
+        timeout = bound_timeout(getattr(settings, "BLOG_PAGE_CACHE_TIMEOUT", None))
+        next_change = Post.objects.next_scheduled_change()
+        if next_change is None:
+            return timeout
+        until = max(math.ceil((next_change - timezone.now()).total_seconds()), 1)
+        return until if timeout is None else min(timeout, until)
+
+    def is_cacheable(self, request):
+        return self.use_cache and request.method == "GET" and not request.GET
+
+    def get_cache_versions(self):
+        return self.cache_versions
+
+    def get_cache_key(self, request):
+        versions = ".".join(
+            str(get_version(name)) for name in self.get_cache_versions()
+        )
+        return f"page:{request.path}:{versions}"
+
+    async def aget_cache_key(self, request):
+        versions = await asyncio.gather(
+            *(aget_version(name) for name in self.get_cache_versions())
+        )
+        return f"page:{request.path}:{'.'.join(str(v) for v in versions)}"
+
+    @staticmethod
+    def cache_stream(key, chunks, content_type, timeout):
+        """
+        Entrega los fragmentos de una respuesta streaming y, si se consumen
+        completos, guarda el contenido en cache.
+        """
+        parts = []
+        for chunk in chunks:
+            parts.append(chunk)
+            yield chunk
+        cache.set(key, (b"".join(parts), content_type), timeout)
+
+    def dispatch(self, request, *args, **kwargs):
+        if self.view_is_async:
+            return self.acached_dispatch(request, *args, **kwargs)
+        if not self.is_cacheable(request):
+            return super().dispatch(request, *args, **kwargs)
+
+        key = self.get_cache_key(request)
+        cached = cache.get(key)
+        if cached is not None:
+            content, content_type = cached
+            return HttpResponse(content, content_type=content_type)
+
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code != 200:
+            return response
+        if response.streaming:
+            response.streaming_content = self.cache_stream(
+                key,
+                response.streaming_content,
+                response["Content-Type"],
+                self.get_cache_timeout(),
+            )
+            return response
+        if hasattr(response, "render"):
+            response.render()
+        cache.set(
+            key,
+            (response.content, response["Content-Type"]),
+            self.get_cache_timeout(),
+        )
+        return response
+
+    async def acached_dispatch(self, request, *args, **kwargs):
+        if not self.is_cacheable(request):
+            return await super().dispatch(request, *args, **kwargs)
+
+        key = await self.aget_cache_key(request)
+        cached = await cache.aget(key)
+        if cached is not None:
+            content, content_type = cached
+            return HttpResponse(content, content_type=content_type)
+
+        response = await super().dispatch(request, *args, **kwargs)
+        # Las vistas async de este mixin no responden en streaming
+        if response.status_code != 200 or response.streaming:
+            return response
+        if hasattr(response, "render"):
+            await sync_to_async(response.render)()
+        await cache.aset(
+            key,
+            (response.content, response["Content-Type"]),
+            await sync_to_async(self.get_cache_timeout)(),
+        )
+        return response
+
+
+class KeysetPaginationMixin:
+    """
+    Sustituye la paginacion por OFFSET de ListView por `KeysetPaginator`.
+
+    Lee los cursores `after`/`before` de la URL y deja en el contexto
+    `page_obj`, `paginator` e `is_paginated` como hace ListView.
+    """
+
+    paginate_by = 10
+
+    def get_keyset_page(self, queryset, page_size):
+        paginator = KeysetPaginator(queryset, page_size)
+        try:
+            page = paginator.get_page(
+                after=self.request.GET.get("after"),
+                before=self.request.GET.get("before"),
+            )
+        except InvalidPage as e:
+            raise Http404(str(e))
+        return paginator, page
+
+    async def aget_keyset_page(self, queryset, page_size):
+        paginator = KeysetPaginator(queryset, page_size)
+        try:
+            page = await paginator.aget_page(
+                after=self.request.GET.get("after"),
+                before=self.request.GET.get("before"),
+            )
+        except InvalidPage as e:
+            raise Http404(str(e))
+        return paginator, page
+
+    @staticmethod
+    def get_page_context(objects_name, paginator, page):
+        return {
+            objects_name: page.object_list,
+            "paginator": paginator,
+            "page_obj": page,
+            "is_paginated": page.has_other_pages(),
+        }
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator, page = self.get_keyset_page(queryset, page_size)
+        return (paginator, page, page.object_list, page.has_other_pages())
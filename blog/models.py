@@ -1,7 +1,14 @@
+from datetime import date, datetime
+
 from django.contrib.auth.models import User
+from django.dispatch import Signal
 from django.urls import reverse
 from django.utils import timezone
-from django.db import models
+from django.db import models, transaction
+
+from . import revisions
+from .images import ImageVariants
+from .rendering import render_content
 
 
 class CategoryQuerySet(models.QuerySet):
@@ -27,6 +34,9 @@ class Category(models.Model):
     objects = CategoryManager()
     name = models.CharField(max_length=50, verbose_name="Nombre")
     slug = models.SlugField(unique=True, null=True)
+    published_posts_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name="Posts publicados"
+    )
     created = models.DateTimeField(auto_now_add=True, verbose_name="Fecha de creacion")
     updated = models.DateTimeField(auto_now=True, verbose_name="Fecha de modificacion")
 
@@ -42,6 +52,21 @@ class Category(models.Model):
         return reverse("blog:detail_category", kwargs={"slug": self.slug})
 
 
+# Campos que Post.render() calcula a partir de content
+RENDERED_FIELDS = ("content_html", "excerpt", "word_count", "reading_time")
+# Campos que deciden si un post cuenta como publicado y para quien
+PUBLICATION_FIELDS = ("status", "deleted_at", "publish_at", "is_live", "user_id")
+# Campos de los que depende is_live
+LIVE_FIELDS = {"status", "deleted_at", "publish_at", "is_live"}
+# Campos que se guardan en el historial (PostRevision)
+REVISION_FIELDS = ("title", "content")
+
+# Cambio en bloque de posts (PostQuerySet.soft_delete/restore), enviado una
+# vez por operacion con `action`, `ids` (afectados) y `live_ids` (los que
+# eran visibles antes); los receptores estan en blog.signals.
+posts_changed = Signal()
+
+
 class PostQuerySet(models.QuerySet):
     def alive(self):
         return self.filter(deleted_at__isnull=True)
@@ -50,32 +75,94 @@ class PostQuerySet(models.QuerySet):
         return self.filter(deleted_at__isnull=False)
 
     def published(self):
-        return self.alive().filter(
-            status=Post.Status.PUBLISHED, publish_at__lte=timezone.now()
+        # is_live lo mantienen Post.save() y publish_scheduled; el predicado
+        # no depende de la hora, asi que el resultado se puede cachear.
+        # Mismo orden que la paginacion por cursor (publish_at, id).
+        return self.alive().filter(is_live=True).order_by("-publish_at", "-id")
+
+    def scheduled(self):
+        return self.alive().filter(status=Post.Status.PUBLISHED, is_live=False)
+
+    def due(self):
+        """Posts programados cuya fecha de publicacion ya paso."""
+        return self.scheduled().filter(publish_at__lte=timezone.now())
+
+    def next_scheduled_change(self):
+        """Fecha del proximo post programado, o None si no hay ninguno."""
+        return (
+            self.scheduled()
+            .order_by("publish_at")
+            .values_list("publish_at", flat=True)
+            .first()
         )
 
     def popular(self):
-        # Por ahora: orden arbitrario (luego métricas reales)
-        return self.published().order_by("-created")
+        # Puntaje precalculado por el comando update_popularity
+        return self.published().order_by("-popularity", "-created")
 
     def drafts(self):
         return self.filter(status=Post.Status.DRAFT)
 
+    def for_listing(self):
+        # Las tarjetas usan excerpt; no hace falta traer el cuerpo del post
+        return self.defer("content", "content_html")
+
     def for_home_latest(self):
-        return self.published()[:3]
+        return self.published().for_listing()[:3]
 
     def for_home_popular(self):
-        return self.popular()[:5]
+        return self.popular().for_listing()[:5]
 
     def featured(self):
         return self.published().filter(is_featured=True)
 
     def for_home_featured(self):
-        return self.featured().first()
+        return self.featured().defer("content").first()
 
     def archived(self):
         return self.alive().filter(status=Post.Status.ARCHIVED)
 
+    def _change(self, action, queryset, **values):
+        with transaction.atomic(using=self.db):
+            rows = list(queryset.order_by().values_list("pk", "is_live"))
+            ids = [pk for pk, is_live in rows]
+            if not ids:
+                return 0
+            count = Post.all_objects.filter(pk__in=ids).update(
+                is_live=False, **values
+            )
+            posts_changed.send(
+                sender=Post,
+                action=action,
+                ids=ids,
+                live_ids=[pk for pk, is_live in rows if is_live],
+            )
+        return count
+
+    def soft_delete(self):
+        """
+        Marca como eliminados los posts del queryset con un solo UPDATE y
+        una sola señal posts_changed (contadores, indice, cache).
+        """
+        now = timezone.now()
+        return self._change(
+            "soft_delete",
+            self.alive(),
+            deleted_at=now,
+            status=Post.Status.DELETED,
+            updated=now,
+        )
+
+    def restore(self):
+        """Devuelve como borradores los posts eliminados del queryset."""
+        return self._change(
+            "restore",
+            self.dead(),
+            deleted_at=None,
+            status=Post.Status.DRAFT,
+            updated=timezone.now(),
+        )
+
 
 class PostManager(models.Manager):
     def get_queryset(self):
@@ -87,6 +174,15 @@ class PostManager(models.Manager):
     def dead(self):
         return PostQuerySet(self.model, using=self._db).dead()
 
+    def due(self):
+        return self.get_queryset().due()
+
+    def next_scheduled_change(self):
+        return self.get_queryset().next_scheduled_change()
+
+    def for_listing(self):
+        return self.get_queryset().for_listing()
+
     def popular(self):
         return self.get_queryset().popular()
 
@@ -96,6 +192,9 @@ class PostManager(models.Manager):
     def for_home_popular(self):
         return self.get_queryset().for_home_popular()
 
+    def featured(self):
+        return self.get_queryset().featured()
+
     def for_home_featured(self):
         return self.get_queryset().for_home_featured()
 
@@ -105,7 +204,7 @@ class PostManager(models.Manager):
 
 class Post(models.Model):
     objects = PostManager()
-    all_objects = models.Manager()  # Manager por defecto
+    all_objects = PostQuerySet.as_manager()  # Manager por defecto
 
     class Status(models.TextChoices):
         DRAFT = "draft", "Borrador"
@@ -114,7 +213,14 @@ class Post(models.Model):
         DELETED = "deleted", "Eliminado"
 
     title = models.CharField(max_length=60, verbose_name="Titulo")
-    content = models.TextField(verbose_name="Contenido")
+    content = models.TextField(verbose_name="Contenido", help_text="Markdown")
+    # Derivados de content; se calculan al guardar (ver blog.rendering)
+    content_html = models.TextField(blank=True, editable=False)
+    excerpt = models.CharField(max_length=300, blank=True, editable=False)
+    word_count = models.PositiveIntegerField(default=0, editable=False)
+    reading_time = models.PositiveSmallIntegerField(
+        default=0, editable=False, verbose_name="Minutos de lectura"
+    )
     user = models.ForeignKey(User, verbose_name="Autor", on_delete=models.CASCADE)
     categories = models.ManyToManyField(
         Category,
@@ -122,6 +228,8 @@ class Post(models.Model):
         related_name="posts",
     )
     image = models.ImageField(blank=True, null=True, verbose_name="Imagen destacada")
+    # Dimensiones y variantes de `image`, ver blog.images
+    image_meta = models.JSONField(default=dict, blank=True, editable=False)
     slug = models.SlugField(unique=True)
     status = models.CharField(
         max_length=10, choices=Status.choices, default=Status.DRAFT
@@ -133,6 +241,24 @@ class Post(models.Model):
         blank=True, null=True, verbose_name="Fecha de eliminacion"
     )
     is_featured = models.BooleanField(default=False, verbose_name="Destacado en Home")
+    is_live = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name="Visible",
+        help_text="Publicado y con fecha de publicacion alcanzada",
+    )
+    popularity = models.FloatField(
+        default=0,
+        editable=False,
+        verbose_name="Popularidad",
+        help_text="Visitas con decaimiento temporal, ver update_popularity",
+    )
+    revision = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Revision",
+        help_text="Numero de la ultima PostRevision",
+    )
     created = models.DateTimeField(auto_now_add=True, verbose_name="Fecha de creacion")
     updated = models.DateTimeField(auto_now=True, verbose_name="Fecha de modificacion")
 
@@ -140,6 +266,47 @@ class Post(models.Model):
         verbose_name = "Publicacion"
         verbose_name_plural = "Publicaciones"
         ordering = ["-created"]
+        # Indices parciales alineados con los filtros de PostQuerySet
+        # (alive/published/featured/archived) y con el orden por defecto.
+        indexes = [
+            models.Index(
+                fields=["-created"],
+                name="post_alive_created_idx",
+                condition=models.Q(deleted_at__isnull=True),
+            ),
+            models.Index(
+                fields=["status", "-created", "publish_at"],
+                name="post_alive_status_idx",
+                condition=models.Q(deleted_at__isnull=True),
+            ),
+            models.Index(
+                fields=["-publish_at", "-id"],
+                name="post_live_publish_idx",
+                condition=models.Q(deleted_at__isnull=True, is_live=True),
+            ),
+            models.Index(
+                fields=["-popularity", "-created"],
+                name="post_popular_idx",
+                condition=models.Q(deleted_at__isnull=True, is_live=True),
+            ),
+            models.Index(
+                fields=["-publish_at", "-id"],
+                name="post_featured_idx",
+                condition=models.Q(
+                    deleted_at__isnull=True, is_live=True, is_featured=True
+                ),
+            ),
+            models.Index(
+                fields=["-updated"],
+                name="post_live_updated_idx",
+                condition=models.Q(deleted_at__isnull=True, is_live=True),
+            ),
+            models.Index(
+                fields=["-created"],
+                name="post_dead_idx",
+                condition=models.Q(deleted_at__isnull=False),
+            ),
+        ]
 
     def __str__(self):
         return self.title
@@ -147,20 +314,388 @@ class Post(models.Model):
     def get_absolute_url(self):
         return reverse("blog:detail_post", kwargs={"slug": self.slug})
 
+    @property
+    def image_variants(self):
+        return ImageVariants(self.image, self.image_meta)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        loaded = dict(zip(field_names, values))
+        if all(field in loaded for field in PUBLICATION_FIELDS):
+            instance._publication_state = {f: loaded[f] for f in PUBLICATION_FIELDS}
+        # Base del delta de la proxima revision, sin leer el historial
+        instance._revision_base = {
+            f: loaded[f] for f in REVISION_FIELDS if f in loaded
+        }
+        return instance
+
+    @staticmethod
+    def published_owner(state):
+        """
+        Retorna el user_id al que cuenta el post si esta visible segun
+        `state` (ver PUBLICATION_FIELDS), o None.
+        """
+        return state["user_id"] if state["is_live"] else None
+
+    def get_publication_state(self):
+        return {field: getattr(self, field) for field in PUBLICATION_FIELDS}
+
+    def compute_is_live(self):
+        return (
+            self.status == self.Status.PUBLISHED
+            and self.deleted_at is None
+            and self.publish_at <= timezone.now()
+        )
+
+    def render(self):
+        for field, value in render_content(self.content).items():
+            setattr(self, field, value)
+
+    def build_revision(self, update_fields):
+        """
+        PostRevision (sin guardar) de este guardado si cambia title o
+        content, o None. Incrementa `revision`.
+
+        El delta se calcula contra los valores cargados de la base, que son
+        los de la revision actual; sin ellos (post nuevo o cargado sin
+        content) la revision es clave si se conoce el contenido.
+        """
+        base = getattr(self, "_revision_base", None) or {}
+        deferred = self.get_deferred_fields()
+        fields = [
+            field
+            for field in REVISION_FIELDS
+            if field not in deferred
+            and (update_fields is None or field in update_fields)
+        ]
+        if not any(getattr(self, field) != base.get(field) for field in fields):
+            return None
+
+        self.revision += 1
+        content_known = "content" not in deferred
+        if not content_known or (
+            update_fields is not None and "content" not in update_fields
+        ):
+            keyframe, data = False, revisions.UNCHANGED
+        elif (
+            "content" not in base
+            or self.revision == 1
+            or revisions.is_keyframe_number(self.revision)
+        ):
+            keyframe, data = True, self.content
+        else:
+            keyframe = False
+            data = revisions.make_delta(base["content"], self.content)
+
+        # None: las mismas que la revision anterior. Las de un post existente
+        # se leen solo en su primera revision; despues las registra
+        # blog.signals.snapshot_revision_categories.
+        category_ids = None
+        if self._state.adding:
+            category_ids = []
+        elif self.revision == 1:
+            category_ids = sorted(self.categories.values_list("pk", flat=True))
+        return PostRevision(
+            number=self.revision,
+            title=self.title,
+            is_keyframe=keyframe,
+            data=revisions.compress(data),
+            category_ids=category_ids,
+        )
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if "content" not in self.get_deferred_fields() and (
+            update_fields is None or "content" in update_fields
+        ):
+            self.render()
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, *RENDERED_FIELDS}
+
+        state = getattr(self, "_publication_state", None)
+        if state is None and not self._state.adding:
+            state = (
+                Post.all_objects.filter(pk=self.pk)
+                .values(*PUBLICATION_FIELDS)
+                .first()
+            )
+        # Los receptores de post_save (contadores) comparan contra estos valores
+        self._publication_state_before = state
+        self._published_owner_before = state and self.published_owner(state)
+
+        self.is_live = self.compute_is_live()
+        if update_fields is not None and LIVE_FIELDS.intersection(update_fields):
+            kwargs["update_fields"] = {*kwargs["update_fields"], "is_live"}
+
+        revision = self.build_revision(update_fields)
+        if revision is not None and update_fields is not None:
+            kwargs["update_fields"] = {*kwargs["update_fields"], "revision"}
+
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
+            if revision is not None:
+                revision.post = self
+                revision.save(using=kwargs.get("using"))
+        self._publication_state = self.get_publication_state()
+        deferred = self.get_deferred_fields()
+        self._revision_base = {
+            **getattr(self, "_revision_base", {}),
+            **{
+                field: getattr(self, field)
+                for field in REVISION_FIELDS
+                if field not in deferred
+                and (update_fields is None or field in update_fields)
+            },
+        }
+
     def delete(self, using=None, keep_parents=False):
-        self.deleted_at = timezone.now()
-        self.status = self.Status.DELETED
-        self.save(update_fields=["deleted_at", "status"])
+        Post.all_objects.filter(pk=self.pk).soft_delete()
+        self.refresh_from_db(fields=[*LIVE_FIELDS, "updated"])
+        self._publication_state = self.get_publication_state()
 
     def restore(self):
-        self.deleted_at = None
-        self.status = self.Status.DRAFT
-        self.save(update_fields=["deleted_at", "status"])
+        Post.all_objects.filter(pk=self.pk).restore()
+        self.refresh_from_db(fields=[*LIVE_FIELDS, "updated"])
+        self._publication_state = self.get_publication_state()
+
+
+class PostRevision(models.Model):
+    """
+    Revision de title, content y categorias de un post, creada por
+    Post.save() con un INSERT y sin leer el historial.
+
+    `data` es content completo en las revisiones clave o un delta contra
+    la revision anterior, comprimido (ver blog.revisions). `category_ids`
+    None significa sin cambios respecto de la revision anterior.
+    """
+
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name="revisions")
+    number = models.PositiveIntegerField(verbose_name="Revision")
+    title = models.CharField(max_length=60, verbose_name="Titulo")
+    is_keyframe = models.BooleanField(default=False, verbose_name="Completa")
+    data = models.BinaryField()
+    category_ids = models.JSONField(null=True, blank=True, verbose_name="Categorias")
+    created = models.DateTimeField(auto_now_add=True, verbose_name="Fecha")
+
+    class Meta:
+        verbose_name = "Revision"
+        verbose_name_plural = "Revisiones"
+        ordering = ["post", "-number"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["post", "number"], name="post_revision_number_uniq"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.post_id} #{self.number}"
+
+
+def get_revision(post_id, number):
+    """
+    Reconstruye la revision `number` de un post: aplica sobre la ultima
+    revision clave anterior los deltas hasta `number` (como mucho
+    BLOG_REVISION_KEYFRAME_INTERVAL). Retorna la PostRevision con
+    `content` y `category_ids` resueltos, o None si no existe.
+    """
+    history = PostRevision.objects.filter(post_id=post_id, number__lte=number)
+    keyframe = (
+        history.filter(is_keyframe=True)
+        .order_by("-number")
+        .values_list("number", flat=True)
+        .first()
+    )
+    if keyframe is None:
+        return None
+    chain = list(history.filter(number__gte=keyframe).order_by("number"))
+    if chain[-1].number != number:
+        return None
+
+    content = ""
+    category_ids = None
+    for revision in chain:
+        data = revisions.decompress(revision.data)
+        content = data if revision.is_keyframe else revisions.apply_delta(content, data)
+        if revision.category_ids is not None:
+            category_ids = revision.category_ids
+    if category_ids is None:
+        category_ids = (
+            history.filter(number__lt=keyframe, category_ids__isnull=False)
+            .order_by("-number")
+            .values_list("category_ids", flat=True)
+            .first()
+        )
+    revision = chain[-1]
+    revision.content = content
+    revision.category_ids = category_ids or []
+    return revision
+
+
+class PostDailyViews(models.Model):
+    """
+    Visitas de un post agrupadas por dia.
+
+    Las filas solo se insertan (nunca se actualizan) desde el buffer de
+    `blog.hits`; puede haber varias filas por (post, dia) hasta que
+    `update_popularity` las compacta.
+    """
+
+    post = models.ForeignKey(
+        Post, on_delete=models.CASCADE, related_name="daily_views"
+    )
+    day = models.DateField(verbose_name="Dia")
+    hits = models.PositiveIntegerField(default=0, verbose_name="Visitas")
+
+    class Meta:
+        verbose_name = "Visitas diarias"
+        verbose_name_plural = "Visitas diarias"
+        indexes = [models.Index(fields=["day", "post"], name="post_views_day_idx")]
+
+    def __str__(self):
+        return f"{self.post_id} {self.day}: {self.hits}"
+
+
+def month_of(value):
+    """(año, mes) de una fecha de publicacion en la zona horaria local."""
+    value = timezone.localtime(value)
+    return value.year, value.month
+
+
+def is_valid_month(year, month):
+    """
+    Si month_range puede calcular los limites del mes: el fin de diciembre
+    de 9999 ya no entra en un datetime.
+    """
+    return 1 <= year <= 9998 and 1 <= month <= 12
+
+
+def month_range(year, month):
+    """Limites [inicio, fin) de un mes en la zona horaria local."""
+    if not is_valid_month(year, month):
+        raise ValueError(f"mes fuera de rango: {year}-{month}")
+    start = datetime(year, month, 1)
+    end = datetime(year + month // 12, month % 12 + 1, 1)
+    return timezone.make_aware(start), timezone.make_aware(end)
+
+
+class PostMonthManager(models.Manager):
+    def with_posts(self):
+        return self.filter(published_posts_count__gt=0)
+
+
+class PostMonth(models.Model):
+    """
+    Posts publicados por mes de publish_at. Lo mantienen las señales de
+    blog.signals junto con published_posts_count de autores y categorias
+    (y el comando recount); la navegacion por fechas lee de aqui en vez de
+    agrupar los posts en cada request.
+    """
+
+    objects = PostMonthManager()
+    year = models.PositiveSmallIntegerField(verbose_name="Año")
+    month = models.PositiveSmallIntegerField(verbose_name="Mes")
+    published_posts_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name="Posts publicados"
+    )
+
+    class Meta:
+        verbose_name = "Mes de publicacion"
+        verbose_name_plural = "Meses de publicacion"
+        ordering = ["-year", "-month"]
+        constraints = [
+            models.UniqueConstraint(fields=["year", "month"], name="post_month_uniq")
+        ]
+
+    def __str__(self):
+        return f"{self.year}-{self.month:02d}"
+
+    def get_absolute_url(self):
+        return reverse(
+            "blog:archive_month", kwargs={"year": self.year, "month": self.month}
+        )
+
+    @property
+    def start(self):
+        return date(self.year, self.month, 1)
+
+
+class RelatedPost(models.Model):
+    """
+    Vecinos precalculados de un post visible: los BLOG_RELATED_POSTS posts
+    visibles con mas categorias en comun, en orden (ver blog.related).
+    """
+
+    post = models.ForeignKey(
+        Post, on_delete=models.CASCADE, related_name="related_links"
+    )
+    related = models.ForeignKey(Post, on_delete=models.CASCADE, related_name="+")
+    position = models.PositiveSmallIntegerField(verbose_name="Posicion")
+    score = models.PositiveSmallIntegerField(verbose_name="Categorias en comun")
+
+    class Meta:
+        verbose_name = "Post relacionado"
+        verbose_name_plural = "Posts relacionados"
+        ordering = ["post", "position"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["post", "position"], name="related_post_position_uniq"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.post_id} -> {self.related_id} ({self.score})"
+
+
+class PostArchive(models.Model):
+    """
+    Posts eliminados hace mas de BLOG_DELETED_RETENTION_DAYS, movidos fuera
+    de blog_post por el comando purge_deleted (ver blog.retention) para que
+    la tabla y sus indices solo tengan el corpus activo.
+
+    Conserva el id original y las categorias para poder restaurarlos; los
+    campos derivados de content se recalculan al restaurar.
+    """
+
+    id = models.BigIntegerField(primary_key=True, verbose_name="Id original")
+    title = models.CharField(max_length=60, verbose_name="Titulo")
+    slug = models.SlugField(db_index=True)
+    content = models.TextField(verbose_name="Contenido")
+    user = models.ForeignKey(
+        User, verbose_name="Autor", on_delete=models.CASCADE, related_name="+"
+    )
+    category_ids = models.JSONField(default=list, verbose_name="Categorias")
+    image = models.CharField(max_length=100, blank=True, verbose_name="Imagen")
+    image_meta = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=Post.Status.choices)
+    publish_at = models.DateTimeField(verbose_name="Fecha de publicacion")
+    deleted_at = models.DateTimeField(verbose_name="Fecha de eliminacion")
+    is_featured = models.BooleanField(default=False)
+    popularity = models.FloatField(default=0)
+    created = models.DateTimeField(verbose_name="Fecha de creacion")
+    updated = models.DateTimeField(verbose_name="Fecha de modificacion")
+    archived_at = models.DateTimeField(
+        auto_now_add=True, verbose_name="Fecha de archivo"
+    )
+
+    class Meta:
+        verbose_name = "Publicacion archivada"
+        verbose_name_plural = "Publicaciones archivadas"
+        ordering = ["-deleted_at"]
+
+    def __str__(self):
+        return self.title
 
 
 class StaticPageManager(models.Manager):
     def by_slug(self, slug):
-        return self.get(slug=slug)
+        # Desde la tabla en memoria de blog.registry, sin consultas
+        from .registry import get_static_page
+
+        page = get_static_page(slug)
+        if page is None:
+            raise StaticPage.DoesNotExist(f"No existe la pagina estatica {slug!r}")
+        return page
 
 
 class StaticPage(models.Model):
@@ -182,7 +717,10 @@ class StaticPage(models.Model):
 
 class AuthorManager(models.Manager):
     def site_author(self):
-        return self.filter(is_site_author=True).first()
+        return self.select_related("user").filter(is_site_author=True).first()
+
+    async def asite_author(self):
+        return await self.select_related("user").filter(is_site_author=True).afirst()
 
 
 class Author(models.Model):
@@ -200,6 +738,7 @@ class Author(models.Model):
         verbose_name="Biografia", blank=True, help_text="Descripcion corta del autor"
     )
     avatar = models.ImageField(blank=True, null=True, verbose_name="Foto de perfil")
+    avatar_meta = models.JSONField(default=dict, blank=True, editable=False)
     website = models.URLField(
         blank=True, verbose_name="Sitio web", help_text="Url complet (htpps://...)"
     )
@@ -221,6 +760,9 @@ class Author(models.Model):
         verbose_name="Autor principal del sitio",
         help_text="Solo puede haber uno marcado como principal",
     )
+    published_posts_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name="Posts publicados"
+    )
     created = models.DateTimeField(auto_now_add=True, verbose_name="Fecha de creacion")
     updated = models.DateTimeField(auto_now=True, verbose_name="Fecha de modificacion")
 
@@ -235,10 +777,19 @@ class Author(models.Model):
     def get_absolute_url(self):
         return reverse("blog:author_profile", kwargs={"pk": self.pk})
 
+    @property
+    def avatar_variants(self):
+        return ImageVariants(self.avatar, self.avatar_meta)
+
     def get_posts_count(self):
-        return self.user.post_set.published().count()
+        # Contador mantenido por blog.signals; ver el comando recount
+        return self.published_posts_count
 
     def save(self, *args, **kwargs):
         if self.is_site_author:
             Author.objects.filter(is_site_author=True).update(is_site_author=False)
+        if self._state.adding and self.user_id:
+            self.published_posts_count = (
+                Post.objects.published().filter(user_id=self.user_id).count()
+            )
         super().save(*args, **kwargs)
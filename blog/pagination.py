@@ -0,0 +1,135 @@
+import base64
+import json
+from datetime import datetime
+
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+# Mayor valor de un BigAutoField
+MAX_PK = 2**63 - 1
+
+
+def _cursor_value(value):
+    # isoformat() conserva los microsegundos; DjangoJSONEncoder los recorta.
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def encode_cursor(values):
+    raw = json.dumps([_cursor_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise InvalidPage("Cursor invalido")
+    if not isinstance(values, list):
+        raise InvalidPage("Cursor invalido")
+    return values
+
+
+class KeysetPage:
+    """
+    Pagina de resultados de un KeysetPaginator.
+
+    Expone la misma interfaz basica que `django.core.paginator.Page`
+    (has_next, has_previous, object_list) mas los cursores para los enlaces.
+    """
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Paginacion por cursor sobre (publish_at, id) en orden descendente.
+
+    En lugar de OFFSET filtra por la clave de la ultima fila vista, asi que
+    cualquier pagina cuesta lo mismo que la primera, y nunca ejecuta COUNT:
+    se pide una fila de mas para saber si hay otra pagina.
+    """
+
+    def __init__(self, queryset, per_page):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+
+    @staticmethod
+    def get_key(obj):
+        return (obj.publish_at, obj.pk)
+
+    @staticmethod
+    def parse_key(values):
+        try:
+            publish_at, pk = values
+            publish_at = parse_datetime(publish_at)
+        except (TypeError, ValueError):
+            raise InvalidPage("Cursor invalido")
+        # encode_cursor solo escribe enteros: un float o un id fuera de rango
+        # es un cursor alterado (y en PostgreSQL fallaria la consulta).
+        if publish_at is None or type(pk) is not int or not 0 < pk <= MAX_PK:
+            raise InvalidPage("Cursor invalido")
+        return publish_at, pk
+
+    def get_queryset(self, after=None, before=None):
+        if before:
+            publish_at, pk = self.parse_key(decode_cursor(before))
+            return self.queryset.filter(
+                Q(publish_at__gt=publish_at) | Q(publish_at=publish_at, pk__gt=pk)
+            ).order_by("publish_at", "pk")[: self.per_page + 1]
+        queryset = self.queryset.order_by("-publish_at", "-pk")
+        if after:
+            publish_at, pk = self.parse_key(decode_cursor(after))
+            queryset = queryset.filter(
+                Q(publish_at__lt=publish_at) | Q(publish_at=publish_at, pk__lt=pk)
+            )
+        return queryset[: self.per_page + 1]
+
+    def build_page(self, rows, after=None, before=None):
+        has_more = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+        if before:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, bool(after)
+
+        if not rows:
+            return KeysetPage(rows)
+        return KeysetPage(
+            rows,
+            next_cursor=encode_cursor(self.get_key(rows[-1])) if has_next else None,
+            previous_cursor=(
+                encode_cursor(self.get_key(rows[0])) if has_previous else None
+            ),
+        )
+
+    def get_page(self, after=None, before=None):
+        rows = list(self.get_queryset(after, before))
+        return self.build_page(rows, after, before)
+
+    async def aget_page(self, after=None, before=None):
+        rows = [row async for row in self.get_queryset(after, before)]
+        return self.build_page(rows, after, before)
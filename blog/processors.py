@@ -1,12 +1,28 @@
+from django.utils.functional import SimpleLazyObject
+
+from core.cache import aget_or_set_versioned, get_or_set_versioned
+
 from .models import Author
-from django.core.cache import cache
+from .signals import SITE_AUTHOR_VERSION
 
 
-def site_author(request):
-    author = cache.get("site_author")
+def get_site_author():
+    return get_or_set_versioned(
+        "site_author",
+        SITE_AUTHOR_VERSION,
+        Author.objects.site_author,
+    )
 
-    if author is None:
-        author = Author.objects.site_author()
-        cache.set("site_author", author, 60 * 60)
 
-    return {"site_author": author}
+async def aget_site_author():
+    # Las vistas async lo resuelven junto con sus consultas (gather_queries)
+    return await aget_or_set_versioned(
+        "site_author",
+        SITE_AUTHOR_VERSION,
+        Author.objects.asite_author,
+    )
+
+
+def site_author(request):
+    # Perezoso: solo las plantillas que usan site_author consultan la cache
+    return {"site_author": SimpleLazyObject(get_site_author)}
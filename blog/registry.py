@@ -0,0 +1,26 @@
+"""
+Paginas estaticas en la memoria del proceso, por slug (ver
+core.cache.VersionedRegistry); las usan StaticPage.objects.by_slug() y
+StaticPageView sin consultar la base de datos.
+"""
+
+from django.db import DEFAULT_DB_ALIAS
+
+from core.cache import VersionedRegistry
+
+from .models import StaticPage
+from .signals import STATIC_PAGES_VERSION
+
+
+def load_static_pages():
+    # De la base principal: una replica atrasada quedaria en memoria
+    return {
+        page.slug: page for page in StaticPage.objects.using(DEFAULT_DB_ALIAS)
+    }
+
+
+static_pages = VersionedRegistry(STATIC_PAGES_VERSION, load_static_pages)
+
+
+def get_static_page(slug):
+    return static_pages.get(slug)
@@ -0,0 +1,127 @@
+import math
+from html import escape, unescape
+from html.parser import HTMLParser
+from urllib.parse import urlparse
+
+from django.utils.html import linebreaks, strip_tags
+from django.utils.text import Truncator
+
+try:
+    import markdown
+except ImportError:  # Sin Markdown se conserva el formato de linebreaks
+    markdown = None
+
+WORDS_PER_MINUTE = 200
+EXCERPT_WORDS = 40
+
+ALLOWED_TAGS = {
+    "a", "abbr", "blockquote", "br", "code", "em", "h1", "h2", "h3", "h4", "h5",
+    "h6", "hr", "img", "li", "ol", "p", "pre", "strong", "table", "tbody",
+    "td", "th", "thead", "tr", "ul",
+}
+VOID_TAGS = {"br", "hr", "img"}
+ALLOWED_ATTRIBUTES = {
+    "a": {"href", "title"},
+    "abbr": {"title"},
+    "img": {"src", "alt", "title"},
+    "th": {"align"},
+    "td": {"align"},
+}
+URL_ATTRIBUTES = {"href", "src"}
+ALLOWED_SCHEMES = {"", "http", "https", "mailto"}
+# Etiquetas cuyo contenido se descarta por completo
+DROP_CONTENT_TAGS = {"script", "style"}
+
+
+class Sanitizer(HTMLParser):
+    """Conserva solo las etiquetas y atributos permitidos; escapa el resto."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.open_tags = []
+        self.dropping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in DROP_CONTENT_TAGS:
+            self.dropping += 1
+            return
+        if self.dropping or tag not in ALLOWED_TAGS:
+            return
+        allowed = ALLOWED_ATTRIBUTES.get(tag, set())
+        rendered = []
+        for name, value in attrs:
+            if name not in allowed or value is None:
+                continue
+            if name in URL_ATTRIBUTES and not self.is_safe_url(value):
+                continue
+            rendered.append(f' {name}="{escape(value)}"')
+        if tag == "a":
+            rendered.append(' rel="nofollow noopener"')
+        self.parts.append(f"<{tag}{''.join(rendered)}>")
+        if tag not in VOID_TAGS:
+            self.open_tags.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag):
+        if tag in DROP_CONTENT_TAGS:
+            self.dropping = max(self.dropping - 1, 0)
+            return
+        if self.dropping or tag not in self.open_tags:
+            return
+        while self.open_tags:
+            current = self.open_tags.pop()
+            self.parts.append(f"</{current}>")
+            if current == tag:
+                break
+
+    def handle_data(self, data):
+        if not self.dropping:
+            self.parts.append(escape(data, quote=False))
+
+    @staticmethod
+    def is_safe_url(value):
+        return urlparse(value.strip()).scheme.lower() in ALLOWED_SCHEMES
+
+    def result(self):
+        self.close()
+        closing = [f"</{tag}>" for tag in reversed(self.open_tags)]
+        return "".join(self.parts + closing)
+
+
+def sanitize_html(html):
+    sanitizer = Sanitizer()
+    sanitizer.feed(html)
+    return sanitizer.result()
+
+
+def to_html(content):
+    if markdown is None:
+        return linebreaks(escape(content))
+    return sanitize_html(
+        markdown.markdown(content, extensions=["extra", "sane_lists"])
+    )
+
+
+def render_content(content):
+    """
+    Convierte el contenido (Markdown) de un post en los campos derivados
+    que se guardan junto a el: content_html, excerpt, word_count y
+    reading_time (minutos).
+    """
+    html = to_html(content or "")
+    text = " ".join(unescape(strip_tags(html)).split())
+    word_count = len(text.split())
+    return {
+        "content_html": html,
+        "excerpt": Truncator(text).words(EXCERPT_WORDS)[:300],
+        "word_count": word_count,
+        "reading_time": math.ceil(word_count / WORDS_PER_MINUTE),
+    }
+
+
+def render_many(items):
+    """Renderiza [(pk, content), ...]; usado por el pool de render_posts."""
+    return [(pk, render_content(content)) for pk, content in items]
@@ -0,0 +1,177 @@
+"""
+Retencion de posts eliminados: archivo (comando purge_deleted) y
+restauracion desde el admin.
+
+Un post eliminado hace mas de BLOG_DELETED_RETENTION_DAYS se mueve con sus
+filas de categorias a PostArchive y se borra de blog_post, por lotes y cada
+lote en su propia transaccion.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import Case, Q, Value, When
+from django.utils import timezone
+
+from .images import schedule_variants
+from .models import (
+    Category,
+    Post,
+    PostArchive,
+    PostDailyViews,
+    PostRevision,
+    RelatedPost,
+)
+
+# Columnas de Post que se guardan tal cual en PostArchive
+ARCHIVE_FIELDS = (
+    "id",
+    "title",
+    "slug",
+    "content",
+    "user_id",
+    "image",
+    "image_meta",
+    "status",
+    "publish_at",
+    "deleted_at",
+    "is_featured",
+    "popularity",
+    "created",
+    "updated",
+)
+
+
+def get_cutoff(days=None):
+    if days is None:
+        days = getattr(settings, "BLOG_DELETED_RETENTION_DAYS", 30)
+    return timezone.now() - timedelta(days=days)
+
+
+def expired_posts(cutoff):
+    return Post.objects.dead().filter(deleted_at__lt=cutoff)
+
+
+def category_ids_by_post(post_ids):
+    Through = Post.categories.through
+    categories = {post_id: [] for post_id in post_ids}
+    rows = Through.objects.filter(post_id__in=post_ids).values_list(
+        "post_id", "category_id"
+    )
+    for post_id, category_id in rows:
+        categories[post_id].append(category_id)
+    return categories
+
+
+def delete_rows(model, ids):
+    """
+    DELETE ... WHERE id IN (...) explicito, sin el Collector de Django.
+
+    QuerySet.delete() enviaria pre/post_delete fila por fila (cargando cada
+    objeto) y las señales borrarian las variantes de la imagen, que deben
+    sobrevivir al archivo y a la restauracion. Las filas dependientes ya se
+    borraron o copiaron antes; `ids` es a lo sumo un lote.
+    """
+    if not ids:
+        return 0
+    connection = connections[router.db_for_write(model)]
+    table = connection.ops.quote_name(model._meta.db_table)
+    column = connection.ops.quote_name(model._meta.pk.column)
+    placeholders = ", ".join(["%s"] * len(ids))
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {table} WHERE {column} IN ({placeholders})", ids)
+        return cursor.rowcount
+
+
+def archive_batch(cutoff, batch_size):
+    """
+    Archiva hasta `batch_size` posts eliminados antes de `cutoff` en una
+    transaccion. Retorna cuantos archivo (0 cuando no quedan).
+    """
+    with transaction.atomic():
+        rows = list(
+            expired_posts(cutoff)
+            .order_by("pk")
+            .select_for_update()
+            .values(*ARCHIVE_FIELDS)[:batch_size]
+        )
+        if not rows:
+            return 0
+        ids = [row["id"] for row in rows]
+        categories = category_ids_by_post(ids)
+        PostArchive.objects.bulk_create(
+            [
+                PostArchive(
+                    **{**row, "image": row["image"] or ""},
+                    category_ids=categories[row["id"]],
+                )
+                for row in rows
+            ]
+        )
+        Post.categories.through.objects.filter(post_id__in=ids).delete()
+        PostDailyViews.objects.filter(post_id__in=ids).delete()
+        # El historial no se archiva: al restaurar empieza en una revision clave
+        PostRevision.objects.filter(post_id__in=ids).delete()
+        RelatedPost.objects.filter(
+            Q(post_id__in=ids) | Q(related_id__in=ids)
+        ).delete()
+        # Sin señales de post_delete: el post ya no era visible (contadores,
+        # indice de busqueda y versiones no cambian) y las variantes de la
+        # imagen se conservan para restaurarlo.
+        delete_rows(Post, ids)
+    return len(rows)
+
+
+def unarchive(queryset):
+    """
+    Devuelve a blog_post los posts archivados de `queryset`, aun
+    eliminados, con su id y las categorias que sigan existiendo.
+
+    Los que tienen un slug que ya usa otro post quedan en el archivo.
+    Retorna `(posts, conflictos)`.
+    """
+    with transaction.atomic():
+        archived = list(queryset.select_for_update())
+        taken = set(
+            Post.all_objects.filter(
+                slug__in=[row.slug for row in archived]
+            ).values_list("slug", flat=True)
+        )
+        conflicts = [row for row in archived if row.slug in taken]
+        archived = [row for row in archived if row.slug not in taken]
+        if not archived:
+            return [], conflicts
+
+        posts = []
+        for row in archived:
+            post = Post(**{field: getattr(row, field) for field in ARCHIVE_FIELDS})
+            post.image = row.image or None
+            post.render()
+            post.is_live = False
+            posts.append(post)
+        ids = [row.pk for row in archived]
+        Post.all_objects.bulk_create(posts)
+        # bulk_create pisa `created` (auto_now_add): se recupera en un UPDATE
+        created = [When(pk=row.pk, then=Value(row.created)) for row in archived]
+        Post.all_objects.filter(pk__in=ids).update(created=Case(*created))
+
+        wanted = {pk for row in archived for pk in row.category_ids}
+        existing = set(
+            Category.objects.filter(pk__in=wanted).values_list("pk", flat=True)
+        )
+        Post.categories.through.objects.bulk_create(
+            [
+                Post.categories.through(post_id=row.pk, category_id=category_id)
+                for row in archived
+                for category_id in row.category_ids
+                if category_id in existing
+            ]
+        )
+        # Sin la señal de PostArchive que borra las variantes de la imagen
+        delete_rows(PostArchive, ids)
+
+        for post in posts:
+            if post.image and post.image_meta.get("source") != post.image.name:
+                schedule_variants(post, "image")
+    return posts, conflicts
@@ -0,0 +1,76 @@
+"""
+Codificacion del historial de revisiones de Post (ver PostRevision).
+
+Cada revision guarda el contenido comprimido con zlib: completo en las
+revisiones clave (una cada BLOG_REVISION_KEYFRAME_INTERVAL) y, en las
+demas, como delta por lineas contra la revision anterior. Reconstruir una
+revision aplica como mucho un intervalo de deltas sobre su clave.
+
+Un delta es una lista JSON de operaciones: `[inicio, fin]` copia esas
+lineas del texto anterior (`fin` null: hasta el final) y un string se
+inserta tal cual.
+"""
+
+import difflib
+import json
+import zlib
+from itertools import islice
+
+from django.conf import settings
+
+# Delta de un guardado que no cambia el contenido
+UNCHANGED = [[0, None]]
+
+
+def get_keyframe_interval():
+    return getattr(settings, "BLOG_REVISION_KEYFRAME_INTERVAL", 20)
+
+
+def is_keyframe_number(number):
+    return number % get_keyframe_interval() == 1
+
+
+def compress(value):
+    return zlib.compress(json.dumps(value).encode(), 9)
+
+
+def decompress(data):
+    return json.loads(zlib.decompress(bytes(data)))
+
+
+def make_delta(old, new):
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    ops = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append([i1, i2])
+        elif j1 < j2:
+            ops.append("".join(new_lines[j1:j2]))
+    return ops
+
+
+def apply_delta(old, ops):
+    old_lines = old.splitlines(keepends=True)
+    parts = []
+    for op in ops:
+        if isinstance(op, str):
+            parts.append(op)
+        else:
+            start, end = op
+            parts.extend(old_lines[start:end])
+    return "".join(parts)
+
+
+def diff_lines(old, new, old_label="", new_label=""):
+    """
+    Lineas de un diff unificado entre dos textos, como `(tipo, linea)` con
+    tipo "add", "del", "hunk" o "" para el contexto.
+    """
+    kinds = {"+": "add", "-": "del", "@": "hunk"}
+    lines = difflib.unified_diff(
+        old.splitlines(), new.splitlines(), old_label, new_label, lineterm=""
+    )
+    # Las dos primeras son la cabecera ---/+++
+    return [(kinds.get(line[:1], ""), line) for line in islice(lines, 2, None)]
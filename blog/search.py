@@ -0,0 +1,266 @@
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.paginator import InvalidPage
+from django.db import connection, transaction
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from django.utils.module_loading import import_string
+from django.utils.safestring import mark_safe
+
+from .pagination import KeysetPage, decode_cursor, encode_cursor
+
+# Delimitadores que el motor inserta alrededor de los terminos encontrados;
+# se sustituyen por <mark> despues de escapar el texto.
+HIGHLIGHT_START = "\x02"
+HIGHLIGHT_END = "\x03"
+
+
+def tokenize(query):
+    return re.findall(r"\w+", query or "")
+
+
+def render_highlight(text):
+    """Escapa `text` y convierte los delimitadores del motor en <mark>."""
+    html = escape(text or "")
+    html = html.replace(HIGHLIGHT_START, "<mark>").replace(HIGHLIGHT_END, "</mark>")
+    return mark_safe(html)
+
+
+class SearchBackend:
+    """
+    Indice invertido de titulo y contenido de Post.
+
+    El indice solo contiene posts vivos (no eliminados); las busquedas
+    publicas se combinan con `Post.objects.published()`.
+    """
+
+    def index(self, post):
+        raise NotImplementedError
+
+    def index_many(self, posts):
+        for post in posts:
+            self.index(post)
+
+    def remove(self, post_ids):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def matching_ids(self, query):
+        """RawSQL con los ids que coinciden, para filtrar con pk__in."""
+        raise NotImplementedError
+
+    def search(self, queryset, query, after=None):
+        """
+        Filtra `queryset` por `query` anotando `search_rank` (menor es mejor),
+        `search_title` y `search_snippet`, ordenado por (search_rank, id).
+        `after` es la clave (search_rank, id) de la ultima fila vista.
+        """
+        raise NotImplementedError
+
+    def rebuild(self, queryset, batch_size=500):
+        count = 0
+        with transaction.atomic():
+            self.clear()
+            posts = queryset.only("title", "content").iterator(chunk_size=batch_size)
+            for post in posts:
+                self.index(post)
+                count += 1
+        return count
+
+
+class SQLiteFTSBackend(SearchBackend):
+    """Motor para SQLite basado en una tabla virtual FTS5 (ver migracion 0015)."""
+
+    table = "blog_post_fts"
+    rank_sql = "bm25(blog_post_fts, 10.0, 1.0)"
+
+    def to_match(self, query):
+        # Cada termino entre comillas (sin sintaxis FTS) y como prefijo.
+        return " ".join(f'"{token}"*' for token in tokenize(query))
+
+    def index(self, post):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table} WHERE rowid = %s", [post.pk])
+            cursor.execute(
+                f"INSERT INTO {self.table} (rowid, title, content) VALUES (%s, %s, %s)",
+                [post.pk, post.title, post.content],
+            )
+
+    def index_many(self, posts):
+        posts = list(posts)
+        self.remove([post.pk for post in posts])
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {self.table} (rowid, title, content) VALUES (%s, %s, %s)",
+                [(post.pk, post.title, post.content) for post in posts],
+            )
+
+    def remove(self, post_ids):
+        post_ids = list(post_ids)
+        if not post_ids:
+            return
+        placeholders = ", ".join(["%s"] * len(post_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {self.table} WHERE rowid IN ({placeholders})", post_ids
+            )
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table}")
+
+    def matching_ids(self, query):
+        return RawSQL(
+            f"SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s",
+            [self.to_match(query)],
+        )
+
+    def search(self, queryset, query, after=None):
+        where = [f"{self.table}.rowid = blog_post.id", f"{self.table} MATCH %s"]
+        params = [self.to_match(query)]
+        if after is not None:
+            where.append(
+                f"({self.rank_sql} > %s OR ({self.rank_sql} = %s AND blog_post.id > %s))"
+            )
+            params += [after[0], after[0], after[1]]
+        marks = f"'{HIGHLIGHT_START}', '{HIGHLIGHT_END}'"
+        return queryset.extra(
+            tables=[self.table],
+            where=where,
+            params=params,
+            select={
+                "search_rank": self.rank_sql,
+                "search_title": f"highlight({self.table}, 0, {marks})",
+                "search_snippet": f"snippet({self.table}, 1, {marks}, '…', 24)",
+            },
+            order_by=["search_rank", "id"],
+        )
+
+
+class PostgresSearchBackend(SearchBackend):
+    """Motor para PostgreSQL con una columna tsvector e indice GIN."""
+
+    table = "blog_post_search"
+
+    @property
+    def config(self):
+        return getattr(settings, "BLOG_SEARCH_CONFIG", "spanish")
+
+    def index(self, post):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {self.table} (post_id, document)
+                VALUES (
+                    %s,
+                    setweight(to_tsvector(%s::regconfig, %s), 'A')
+                    || setweight(to_tsvector(%s::regconfig, %s), 'B')
+                )
+                ON CONFLICT (post_id) DO UPDATE SET document = EXCLUDED.document
+                """,
+                [post.pk, self.config, post.title, self.config, post.content],
+            )
+
+    def remove(self, post_ids):
+        post_ids = list(post_ids)
+        if not post_ids:
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {self.table} WHERE post_id = ANY(%s)", [post_ids]
+            )
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"TRUNCATE {self.table}")
+
+    def matching_ids(self, query):
+        return RawSQL(
+            f"SELECT post_id FROM {self.table} "
+            "WHERE document @@ websearch_to_tsquery(%s::regconfig, %s)",
+            [self.config, query],
+        )
+
+    def search(self, queryset, query, after=None):
+        tsquery = "websearch_to_tsquery(%s::regconfig, %s)"
+        rank_sql = f"-ts_rank_cd({self.table}.document, {tsquery})"
+        where = [
+            f"{self.table}.post_id = blog_post.id",
+            f"{self.table}.document @@ {tsquery}",
+        ]
+        params = [self.config, query]
+        if after is not None:
+            where.append(
+                f"({rank_sql} > %s OR ({rank_sql} = %s AND blog_post.id > %s))"
+            )
+            params += [self.config, query, after[0], self.config, query, after[0], after[1]]
+        options = f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_END}"
+        return queryset.extra(
+            tables=[self.table],
+            where=where,
+            params=params,
+            select={
+                "search_rank": rank_sql,
+                "search_title": f"ts_headline(%s::regconfig, blog_post.title, {tsquery}, "
+                f"'{options}, HighlightAll=true')",
+                "search_snippet": f"ts_headline(%s::regconfig, blog_post.content, {tsquery}, "
+                f"'{options}, MaxWords=35')",
+            },
+            select_params=[self.config, query] + [self.config, self.config, query] * 2,
+            order_by=["search_rank", "id"],
+        )
+
+
+BACKENDS = {
+    "sqlite": "blog.search.SQLiteFTSBackend",
+    "postgresql": "blog.search.PostgresSearchBackend",
+}
+
+
+@lru_cache(maxsize=None)
+def get_backend():
+    path = getattr(settings, "BLOG_SEARCH_BACKEND", None) or BACKENDS.get(
+        connection.vendor
+    )
+    if path is None:
+        return None
+    return import_string(path)()
+
+
+class SearchPaginator:
+    """
+    Paginacion por cursor sobre (search_rank, id), solo hacia adelante.
+    """
+
+    def __init__(self, queryset, query, per_page, backend=None):
+        self.queryset = queryset
+        self.query = query
+        self.per_page = int(per_page)
+        self.backend = backend or get_backend()
+
+    def get_page(self, after=None):
+        key = None
+        if after:
+            try:
+                rank, pk = decode_cursor(after)
+                key = (float(rank), int(pk))
+            except (TypeError, ValueError):
+                raise InvalidPage("Cursor invalido")
+
+        if self.backend is None or not tokenize(self.query):
+            return KeysetPage([])
+        queryset = self.backend.search(self.queryset, self.query, after=key)
+        rows = list(queryset[: self.per_page + 1])
+        has_next = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+        for post in rows:
+            post.search_title = render_highlight(post.search_title)
+            post.search_snippet = render_highlight(post.search_snippet)
+        next_cursor = None
+        if has_next:
+            next_cursor = encode_cursor((rows[-1].search_rank, rows[-1].pk))
+        return KeysetPage(rows, next_cursor=next_cursor)
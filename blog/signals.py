@@ -0,0 +1,423 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, ExtractMonth, ExtractYear, Greatest
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from core.cache import bump_version_on_commit
+
+from pages.models import Page
+
+from .images import IMAGE_FIELDS, delete_variants, schedule_variants
+from .models import (
+    Author,
+    Category,
+    Post,
+    PostArchive,
+    PostMonth,
+    PostRevision,
+    RelatedPost,
+    StaticPage,
+    month_of,
+    posts_changed,
+)
+from .related import refresh as refresh_related
+from .search import get_backend
+
+# Version de todo lo que se muestra en las paginas publicas del blog
+CONTENT_VERSION = "blog:content"
+# Version del autor principal (blog.processors.site_author)
+SITE_AUTHOR_VERSION = "blog:site_author"
+# Version de las paginas estaticas en memoria (blog.registry)
+STATIC_PAGES_VERSION = "blog:static_pages"
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Author)
+@receiver(post_delete, sender=Author)
+def bump_content_version(sender, **kwargs):
+    # Post.delete()/restore() no guardan: ver bump_versions_for_posts
+    bump_version_on_commit(CONTENT_VERSION)
+
+
+@receiver(post_save, sender=Author)
+@receiver(post_delete, sender=Author)
+def bump_site_author_version(sender, **kwargs):
+    # Cualquier autor: el guardado puede quitar o dar is_site_author
+    bump_version_on_commit(SITE_AUTHOR_VERSION)
+
+
+@receiver(post_save, sender=StaticPage)
+@receiver(post_delete, sender=StaticPage)
+def bump_static_pages_version(sender, **kwargs):
+    # Tras el commit, ver core.cache.VersionedRegistry
+    bump_version_on_commit(STATIC_PAGES_VERSION)
+
+
+@receiver(m2m_changed, sender=Post.categories.through)
+def bump_content_version_on_categories(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        bump_version_on_commit(CONTENT_VERSION)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Author)
+@receiver(post_delete, sender=Author)
+@receiver(post_save, sender=Page)
+@receiver(post_delete, sender=Page)
+def bump_sitemap_shard(sender, instance, **kwargs):
+    """Invalida solo el fragmento del sitemap que contiene a `instance`."""
+    from .sitemaps import section_for, shard_of, shard_version
+
+    section = section_for(sender)
+    if section is not None:
+        bump_version_on_commit(
+            shard_version(section.name, shard_of(instance.pk))
+        )
+
+
+@receiver(posts_changed, sender=Post)
+def bump_versions_for_posts(sender, ids, **kwargs):
+    """Una invalidacion por operacion en bloque, no una por post."""
+    from .sitemaps import section_for, shard_of, shard_version
+
+    bump_version_on_commit(CONTENT_VERSION)
+    section = section_for(sender)
+    for shard in {shard_of(pk) for pk in ids}:
+        bump_version_on_commit(shard_version(section.name, shard))
+
+
+# Campos de Post que afectan al indice de busqueda
+SEARCH_FIELDS = {"title", "content", "deleted_at", "status"}
+
+
+@receiver(post_save, sender=Post)
+def update_search_index(sender, instance, update_fields=None, **kwargs):
+    backend = get_backend()
+    if backend is None:
+        return
+    if update_fields is not None and not SEARCH_FIELDS.intersection(update_fields):
+        return
+    if instance.deleted_at is None:
+        backend.index(instance)
+    else:
+        backend.remove([instance.pk])
+
+
+@receiver(post_delete, sender=Post)
+def remove_from_search_index(sender, instance, **kwargs):
+    backend = get_backend()
+    if backend is not None:
+        backend.remove([instance.pk])
+
+
+@receiver(posts_changed, sender=Post)
+def update_search_index_for_posts(sender, action, ids, **kwargs):
+    backend = get_backend()
+    if backend is None:
+        return
+    if action == "soft_delete":
+        backend.remove(ids)
+        return
+    backend.index_many(Post.objects.filter(pk__in=ids).only("title", "content"))
+
+
+def recount_published_counters(user_ids=None, category_ids=None):
+    """
+    Recalcula published_posts_count con una consulta agregada por tabla,
+    de todos los autores y categorias o solo de los ids indicados.
+    Retorna cuantos autores y categorias se actualizaron.
+    """
+    published = Post.objects.published().order_by()
+    by_user = (
+        published.filter(user_id=OuterRef("user_id"))
+        .values("user_id")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    by_category = (
+        published.filter(categories=OuterRef("pk"))
+        .values("categories")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    authors = Author.objects.all()
+    if user_ids is not None:
+        authors = authors.filter(user_id__in=user_ids)
+    categories = Category.objects.all()
+    if category_ids is not None:
+        categories = categories.filter(pk__in=category_ids)
+
+    with transaction.atomic():
+        author_count = authors.update(
+            published_posts_count=Coalesce(Subquery(by_user), 0)
+        )
+        category_count = categories.update(
+            published_posts_count=Coalesce(Subquery(by_category), 0)
+        )
+    return author_count, category_count
+
+
+def recount_month_counters():
+    """
+    Recalcula PostMonth desde cero con una consulta agregada (meses en la
+    zona horaria local, igual que month_of). Retorna cuantos meses tienen
+    posts publicados.
+    """
+    rows = (
+        Post.objects.published()
+        .order_by()
+        .annotate(year=ExtractYear("publish_at"), month=ExtractMonth("publish_at"))
+        .values("year", "month")
+        .annotate(total=Count("pk"))
+    )
+    with transaction.atomic():
+        PostMonth.objects.update(published_posts_count=0)
+        months = PostMonth.objects.bulk_create(
+            [
+                PostMonth(
+                    year=row["year"],
+                    month=row["month"],
+                    published_posts_count=row["total"],
+                )
+                for row in rows
+            ],
+            update_conflicts=True,
+            unique_fields=["year", "month"],
+            update_fields=["published_posts_count"],
+        )
+    return len(months)
+
+
+def adjust_month_counters(deltas):
+    """Suma a published_posts_count de cada mes `{(año, mes): delta}`."""
+    for (year, month), delta in deltas.items():
+        if not delta:
+            continue
+        PostMonth.objects.get_or_create(year=year, month=month)
+        PostMonth.objects.filter(year=year, month=month).update(
+            published_posts_count=Greatest(F("published_posts_count") + delta, 0)
+        )
+
+
+def adjust_published_counters(delta, user_id=None, category_ids=()):
+    """Suma `delta` a published_posts_count del autor y de las categorias."""
+    if not delta:
+        return
+    value = Greatest(F("published_posts_count") + delta, 0)
+    if user_id is not None:
+        Author.objects.filter(user_id=user_id).update(published_posts_count=value)
+        # El contador se muestra en la tarjeta del autor principal
+        bump_version_on_commit(SITE_AUTHOR_VERSION)
+    if category_ids:
+        Category.objects.filter(pk__in=category_ids).update(
+            published_posts_count=value
+        )
+
+
+@receiver(post_save, sender=Post)
+def update_published_counters(sender, instance, created, **kwargs):
+    # Post.save() deja en _published_owner_before el estado previo
+    before = getattr(instance, "_published_owner_before", None)
+    after = instance.published_owner(instance.get_publication_state())
+    if before == after:
+        return
+
+    adjust_published_counters(-1, user_id=before)
+    adjust_published_counters(1, user_id=after)
+    if (before is None) != (after is None) and not created:
+        category_ids = list(instance.categories.values_list("pk", flat=True))
+        adjust_published_counters(
+            1 if after else -1, category_ids=category_ids
+        )
+
+
+@receiver(post_save, sender=Post)
+def update_month_counters(sender, instance, **kwargs):
+    # Cubre tambien el cambio de publish_at de un post visible
+    before = getattr(instance, "_publication_state_before", None)
+    deltas = Counter()
+    if before and instance.published_owner(before):
+        deltas[month_of(before["publish_at"])] -= 1
+    if instance.is_live:
+        deltas[month_of(instance.publish_at)] += 1
+    adjust_month_counters(deltas)
+
+
+@receiver(m2m_changed, sender=Post.categories.through)
+def update_category_counters(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "pre_clear", "post_clear"):
+        return
+    sign = -1 if action in ("post_remove", "post_clear") else 1
+
+    if reverse:
+        # instance es una Category y pk_set son ids de posts
+        if action == "post_clear":
+            Category.objects.filter(pk=instance.pk).update(published_posts_count=0)
+        elif action != "pre_clear":
+            count = Post.objects.published().filter(pk__in=pk_set).count()
+            adjust_published_counters(sign * count, category_ids=[instance.pk])
+        return
+
+    if not instance.is_live:
+        return
+    if action == "pre_clear":
+        instance._cleared_category_ids = list(
+            instance.categories.values_list("pk", flat=True)
+        )
+    elif action == "post_clear":
+        category_ids = instance.__dict__.pop("_cleared_category_ids", [])
+        adjust_published_counters(-1, category_ids=category_ids)
+    else:
+        adjust_published_counters(sign, category_ids=pk_set)
+
+
+@receiver(posts_changed, sender=Post)
+def update_counters_for_posts(sender, live_ids, **kwargs):
+    # Las operaciones en bloque nunca publican: solo se recuentan los autores
+    # y categorias de los posts que dejaron de estar visibles.
+    if not live_ids:
+        return
+    user_ids = set(
+        Post.all_objects.filter(pk__in=live_ids).values_list("user_id", flat=True)
+    )
+    category_ids = set(
+        Post.categories.through.objects.filter(post_id__in=live_ids).values_list(
+            "category_id", flat=True
+        )
+    )
+    recount_published_counters(user_ids, category_ids)
+    months = Counter(
+        month_of(publish_at)
+        for publish_at in Post.all_objects.filter(pk__in=live_ids).values_list(
+            "publish_at", flat=True
+        )
+    )
+    adjust_month_counters({month: -count for month, count in months.items()})
+    # El contador se muestra en la tarjeta del autor principal
+    bump_version_on_commit(SITE_AUTHOR_VERSION)
+
+
+@receiver(post_save, sender=Post)
+def refresh_related_on_publication(sender, instance, **kwargs):
+    # Solo cuando el post aparece o desaparece del sitio
+    before = getattr(instance, "_published_owner_before", None)
+    after = instance.published_owner(instance.get_publication_state())
+    if (before is None) != (after is None):
+        refresh_related([instance.pk])
+
+
+@receiver(m2m_changed, sender=Post.categories.through)
+def refresh_related_on_categories(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        # Un post no visible no tiene lista ni aparece en otras
+        if action in ("post_add", "post_remove", "post_clear") and instance.is_live:
+            refresh_related([instance.pk])
+    elif action == "pre_clear":
+        instance._cleared_post_ids = list(
+            instance.posts.filter(is_live=True).values_list("pk", flat=True)
+        )
+    elif action == "post_clear":
+        refresh_related(instance.__dict__.pop("_cleared_post_ids", []))
+    elif action in ("post_add", "post_remove"):
+        refresh_related(pk_set)
+
+
+@receiver(m2m_changed, sender=Post.categories.through)
+def snapshot_revision_categories(sender, instance, action, reverse, pk_set, **kwargs):
+    """Las categorias actuales pasan a la ultima revision de los posts."""
+    Through = Post.categories.through
+    if reverse and action == "pre_clear":
+        instance._cleared_revision_posts = list(
+            Through.objects.filter(category_id=instance.pk).values_list(
+                "post_id", flat=True
+            )
+        )
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if reverse:
+        if action == "post_clear":
+            pk_set = instance.__dict__.pop("_cleared_revision_posts", [])
+        posts = Post.all_objects.filter(pk__in=pk_set).values_list("pk", "revision")
+    else:
+        posts = [(instance.pk, instance.revision)]
+    for post_id, number in posts:
+        if number:
+            category_ids = Through.objects.filter(post_id=post_id).values_list(
+                "category_id", flat=True
+            )
+            PostRevision.objects.filter(post_id=post_id, number=number).update(
+                category_ids=sorted(category_ids)
+            )
+
+
+@receiver(posts_changed, sender=Post)
+def refresh_related_for_posts(sender, action, live_ids, **kwargs):
+    # Restaurar deja borradores: solo importan los que dejaron de ser visibles
+    if action == "soft_delete":
+        refresh_related(live_ids)
+
+
+@receiver(pre_delete, sender=Post)
+def collect_related_neighbours(sender, instance, **kwargs):
+    # El CASCADE borra las filas que apuntan al post antes de post_delete
+    instance._related_neighbours = list(
+        RelatedPost.objects.filter(related=instance).values_list("post_id", flat=True)
+    )
+
+
+@receiver(post_delete, sender=Post)
+def refresh_related_neighbours(sender, instance, **kwargs):
+    refresh_related(instance.__dict__.pop("_related_neighbours", []))
+
+
+@receiver(pre_delete, sender=Post)
+def collect_deleted_post_categories(sender, instance, **kwargs):
+    if instance.is_live:
+        instance._deleted_category_ids = list(
+            instance.categories.values_list("pk", flat=True)
+        )
+
+
+@receiver(post_delete, sender=Post)
+def discount_deleted_post(sender, instance, **kwargs):
+    category_ids = instance.__dict__.pop("_deleted_category_ids", None)
+    if category_ids is not None:
+        adjust_published_counters(
+            -1, user_id=instance.user_id, category_ids=category_ids
+        )
+        adjust_month_counters({month_of(instance.publish_at): -1})
+
+
+def image_fields(instance):
+    return [name for name in IMAGE_FIELDS if hasattr(instance, name)]
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Author)
+def process_images(sender, instance, update_fields=None, **kwargs):
+    """Genera las variantes si la imagen cambio desde el ultimo proceso."""
+    for field_name in image_fields(instance):
+        if update_fields is not None and field_name not in update_fields:
+            continue
+        field = getattr(instance, field_name)
+        meta = getattr(instance, IMAGE_FIELDS[field_name])
+        if field and meta.get("source") != field.name:
+            schedule_variants(instance, field_name)
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Author)
+@receiver(post_delete, sender=PostArchive)
+def delete_image_variants(sender, instance, **kwargs):
+    for field_name in image_fields(instance):
+        delete_variants(getattr(instance, IMAGE_FIELDS[field_name]))
@@ -0,0 +1,165 @@
+from xml.sax.saxutils import escape
+
+from django.db.models import Max
+from django.http import Http404, StreamingHttpResponse
+from django.urls import reverse
+from django.views import View
+
+from pages.models import Page
+
+from .mixins import CachedResponseMixin
+from .models import Author, Category, Post
+
+# Limite de URLs por archivo del protocolo sitemaps.org
+SHARD_SIZE = 50000
+CONTENT_TYPE = "application/xml; charset=utf-8"
+XML_HEADER = '<?xml version="1.0" encoding="utf-8"?>\n'
+XMLNS = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+# URLs por fragmento de la respuesta streaming
+CHUNK_ROWS = 500
+
+
+def shard_of(pk):
+    return pk // SHARD_SIZE
+
+
+def shard_version(section, shard):
+    """Nombre de la version de cache de un fragmento, ver blog.signals."""
+    return f"sitemap:{section}:{shard}"
+
+
+class SitemapSection:
+    """
+    Un tipo de URL del sitemap. Los fragmentos son rangos fijos de pk
+    ([n * SHARD_SIZE, (n + 1) * SHARD_SIZE)), asi un cambio en un objeto
+    solo invalida el fragmento que lo contiene.
+    """
+
+    name = None
+    model = None
+    fields = ("slug", "updated")
+
+    def get_queryset(self):
+        return self.model._default_manager.all()
+
+    def location(self, row):
+        raise NotImplementedError
+
+    def shard_count(self):
+        last = self.model._base_manager.aggregate(last=Max("pk"))["last"]
+        return 0 if last is None else shard_of(last) + 1
+
+    def rows(self, shard):
+        start = shard * SHARD_SIZE
+        queryset = (
+            self.get_queryset()
+            .filter(pk__gte=start, pk__lt=start + SHARD_SIZE)
+            .order_by("pk")
+            .values_list(*self.fields)
+        )
+        return queryset.iterator(chunk_size=2000)
+
+
+class PostSection(SitemapSection):
+    name = "posts"
+    model = Post
+
+    def get_queryset(self):
+        return Post.objects.published()
+
+    def location(self, row):
+        return reverse("blog:detail_post", kwargs={"slug": row[0]})
+
+
+class CategorySection(SitemapSection):
+    name = "categories"
+    model = Category
+
+    def get_queryset(self):
+        return Category.objects.exclude(slug=None)
+
+    def location(self, row):
+        return reverse("blog:detail_category", kwargs={"slug": row[0]})
+
+
+class AuthorSection(SitemapSection):
+    name = "authors"
+    model = Author
+    fields = ("pk", "updated")
+
+    def location(self, row):
+        return reverse("blog:author_detail", kwargs={"pk": row[0]})
+
+
+class PageSection(SitemapSection):
+    name = "pages"
+    model = Page
+
+    def get_queryset(self):
+        return Page.objects.filter(is_active=True)
+
+    def location(self, row):
+        return reverse("pages:page_detail", kwargs={"slug": row[0]})
+
+
+SECTIONS = {
+    section.name: section()
+    for section in (PostSection, CategorySection, AuthorSection, PageSection)
+}
+
+
+def section_for(model):
+    for section in SECTIONS.values():
+        if section.model is model:
+            return section
+    return None
+
+
+class SitemapIndexView(View):
+    """Indice con un <sitemap> por fragmento de cada seccion."""
+
+    def get(self, request, *args, **kwargs):
+        return StreamingHttpResponse(self.generate(), content_type=CONTENT_TYPE)
+
+    def generate(self):
+        yield f"{XML_HEADER}<sitemapindex {XMLNS}>".encode()
+        for name, section in SECTIONS.items():
+            for shard in range(section.shard_count()):
+                url = reverse(
+                    "sitemap_section", kwargs={"section": name, "shard": shard}
+                )
+                location = self.request.build_absolute_uri(url)
+                yield f"<sitemap><loc>{escape(location)}</loc></sitemap>".encode()
+        yield b"</sitemapindex>"
+
+
+class SitemapSectionView(CachedResponseMixin, View):
+    """
+    Un fragmento del sitemap, generado en streaming y guardado en cache
+    hasta que cambie un objeto de su rango de pk.
+    """
+
+    def get_cache_versions(self):
+        return (shard_version(self.kwargs["section"], self.kwargs["shard"]),)
+
+    def get(self, request, *args, section, shard, **kwargs):
+        sitemap = SECTIONS.get(section)
+        if sitemap is None or shard >= sitemap.shard_count():
+            raise Http404("Sitemap inexistente")
+        return StreamingHttpResponse(
+            self.generate(sitemap, shard), content_type=CONTENT_TYPE
+        )
+
+    def generate(self, sitemap, shard):
+        yield f"{XML_HEADER}<urlset {XMLNS}>".encode()
+        chunk = []
+        for row in sitemap.rows(shard):
+            location = self.request.build_absolute_uri(sitemap.location(row))
+            chunk.append(
+                f"<url><loc>{escape(location)}</loc>"
+                f"<lastmod>{row[-1].date().isoformat()}</lastmod></url>"
+            )
+            if len(chunk) == CHUNK_ROWS:
+                yield "".join(chunk).encode()
+                chunk = []
+        yield ("".join(chunk) + "</urlset>").encode()
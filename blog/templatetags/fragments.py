@@ -0,0 +1,42 @@
+from django import template
+
+from blog.fragments import fragment_key, get_or_render
+
+register = template.Library()
+
+
+class CachedFragmentNode(template.Node):
+    def __init__(self, nodelist, name, vary_on):
+        self.nodelist = nodelist
+        self.name = name
+        self.vary_on = vary_on
+
+    def render(self, context):
+        key = fragment_key(
+            self.name.resolve(context),
+            *(value.resolve(context) for value in self.vary_on),
+        )
+        return get_or_render(key, lambda: self.nodelist.render(context))
+
+
+@register.tag
+def cachefragment(parser, token):
+    """
+    Guarda en cache el contenido del bloque segun los objetos indicados:
+
+        {% cachefragment "post_card" post %} ... {% endcachefragment %}
+
+    Ver blog.fragments.fragment_key.
+    """
+    bits = token.split_contents()
+    if len(bits) < 3:
+        raise template.TemplateSyntaxError(
+            f"'{bits[0]}' necesita un nombre y al menos un valor"
+        )
+    nodelist = parser.parse(("endcachefragment",))
+    parser.delete_first_token()
+    return CachedFragmentNode(
+        nodelist,
+        parser.compile_filter(bits[1]),
+        [parser.compile_filter(bit) for bit in bits[2:]],
+    )
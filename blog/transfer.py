@@ -0,0 +1,85 @@
+"""
+Formato de intercambio de posts usado por los comandos import_posts y
+export_posts: un registro por linea (JSONL) o por fila (CSV).
+"""
+
+import csv
+import json
+
+FORMATS = ("jsonl", "csv")
+FIELDS = (
+    "slug",
+    "title",
+    "content",
+    "author",
+    "categories",
+    "status",
+    "publish_at",
+    "deleted_at",
+    "is_featured",
+    "image",
+)
+# Separador de categorias dentro de una celda CSV
+CSV_LIST_SEPARATOR = "|"
+
+
+def detect_format(path, default="jsonl"):
+    for fmt in FORMATS:
+        if str(path).endswith(f".{fmt}"):
+            return fmt
+    return default
+
+
+def read_records(stream, fmt, on_error=None):
+    """
+    Genera (numero de linea, registro) leyendo de a una linea; las
+    categorias siempre se entregan como lista.
+
+    Una linea JSONL mal formada llama a `on_error(numero, error)` y la
+    lectura sigue con la siguiente; sin `on_error` se lanza ValueError.
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            categories = record.get("categories") or ""
+            record["categories"] = [
+                value for value in categories.split(CSV_LIST_SEPARATOR) if value
+            ]
+            record["is_featured"] = record.get("is_featured") in ("1", "true", "True")
+            yield reader.line_num, record
+        return
+
+    for number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError("se esperaba un objeto JSON")
+        except ValueError as e:
+            if on_error is None:
+                raise
+            on_error(number, e)
+            continue
+        yield number, record
+
+
+class RecordWriter:
+    def __init__(self, stream, fmt):
+        self.stream = stream
+        self.fmt = fmt
+        if fmt == "csv":
+            self.writer = csv.DictWriter(stream, fieldnames=FIELDS)
+            self.writer.writeheader()
+
+    def write(self, record):
+        if self.fmt == "csv":
+            self.writer.writerow(
+                {
+                    **record,
+                    "categories": CSV_LIST_SEPARATOR.join(record["categories"]),
+                    "is_featured": int(record["is_featured"]),
+                }
+            )
+        else:
+            self.stream.write(json.dumps(record, ensure_ascii=False) + "\n")
@@ -1,10 +1,44 @@
 from django.urls import path
-from .views import AuthorDetailView, ListPostView, DetailPostView, PostByCategoryView
+from .feeds import AuthorFeedView, CategoryFeedView, PostFeedView
+from .views import (
+    ArchiveMonthView,
+    AuthorDetailView,
+    ListPostView,
+    DetailPostView,
+    PostByCategoryView,
+    SearchPostView,
+)
 
 app_name = "blog"
 urlpatterns = [
     path("", ListPostView.as_view(), name="list_posts"),
+    path("search/", SearchPostView.as_view(), name="search"),
+    path("feed/", PostFeedView.as_view(), name="feed"),
+    path("feed/rss/", PostFeedView.as_view(), {"feed_format": "rss"}, name="feed_rss"),
+    path(
+        "archive/<int:year>/<int:month>/",
+        ArchiveMonthView.as_view(),
+        name="archive_month",
+    ),
     path("<slug:slug>/", DetailPostView.as_view(), name="detail_post"),
     path("category/<slug:slug>/", PostByCategoryView.as_view(), name="detail_category"),
+    path(
+        "category/<slug:slug>/feed/",
+        CategoryFeedView.as_view(),
+        name="category_feed",
+    ),
+    path(
+        "category/<slug:slug>/feed/rss/",
+        CategoryFeedView.as_view(),
+        {"feed_format": "rss"},
+        name="category_feed_rss",
+    ),
     path("author/<int:pk>/", AuthorDetailView.as_view(), name="author_detail"),
+    path("author/<int:pk>/feed/", AuthorFeedView.as_view(), name="author_feed"),
+    path(
+        "author/<int:pk>/feed/rss/",
+        AuthorFeedView.as_view(),
+        {"feed_format": "rss"},
+        name="author_feed_rss",
+    ),
 ]
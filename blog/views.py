@@ -1,18 +1,85 @@
-from django.shortcuts import get_object_or_404, render
-from django.views.generic import ListView, DetailView, TemplateView
-from .models import Post, Category, Author, StaticPage
+from django.core.paginator import InvalidPage
+from django.db.models import Max, Q
+from django.http import Http404
+from django.shortcuts import aget_object_or_404, render
+from django.views.generic import DetailView, TemplateView
+from core.concurrency import gather_queries
+from core.mixins import ConditionalGetMixin
+from .hits import record_hit
+from .mixins import (
+    LAYOUT_VERSIONS,
+    CachedResponseMixin,
+    KeysetPaginationMixin,
+    layout_queries,
+)
+from .models import (
+    Post,
+    Category,
+    Author,
+    StaticPage,
+    RelatedPost,
+    PostMonth,
+    is_valid_month,
+    month_range,
+)
+from .registry import get_static_page
+from .related import get_related
+from .search import SearchPaginator
+from .signals import CONTENT_VERSION, STATIC_PAGES_VERSION
 
 
-class ListPostView(ListView):
+class ListPostView(CachedResponseMixin, KeysetPaginationMixin, TemplateView):
+    """
+    Vista async: la pagina de posts y el contexto de base.html se consultan
+    a la vez (ver core.concurrency).
+    """
+
     # model = Post
-    queryset = Post.objects.published()
-    context_object_name = "posts"
+    template_name = "blog/post_list.html"
+    concurrent_queries = True
+
+    def get_queryset(self):
+        return Post.objects.published().for_listing()
+
+    async def get(self, request, *args, **kwargs):
+        results = await gather_queries(
+            {
+                "page": self.aget_keyset_page(self.get_queryset(), self.paginate_by),
+                **layout_queries(),
+            },
+            concurrent=self.concurrent_queries,
+        )
+        context = self.get_context_data(**kwargs)
+        context.update(self.get_page_context("posts", *results.pop("page")))
+        context.update(results)
+        return self.render_to_response(context)
 
 
-class DetailPostView(DetailView):
+class DetailPostView(ConditionalGetMixin, DetailView):
     # model = Post
     # queryset = Post.objects.published()
     context_object_name = "post"
+    track_views = True
+    etag_versions = LAYOUT_VERSIONS
+
+    def get_validators(self, request, *args, **kwargs):
+        row = (
+            Post.objects.published()
+            .filter(slug=kwargs["slug"])
+            .values_list("updated", "user__author_profile__updated")
+            .first()
+        )
+        if row is None:
+            return None
+        # Las tarjetas de relacionados cambian con la lista o con esos posts
+        related = list(
+            RelatedPost.objects.filter(post__slug=kwargs["slug"]).values_list(
+                "related_id", "related__updated"
+            )
+        )
+        dates = [value for value in row if value is not None]
+        dates.extend(updated for pk, updated in related)
+        return (row, related), max(dates)
 
     def get_queryset(self):
         query = Post.objects.published().select_related("user")
@@ -21,37 +88,70 @@ class DetailPostView(DetailView):
 
         return query
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # Precalculados en blog.related: K ids y un in_bulk
+        context["related_posts"] = get_related(self.object)
+        return context
+
+    def get(self, request, *args, **kwargs):
+        response = super().get(request, *args, **kwargs)
+        # Solo se acumula en memoria; blog.hits escribe por lotes.
+        if self.track_views:
+            record_hit(self.object.pk)
+        return response
 
-class PostByCategoryView(ListView):
+
+class PostByCategoryView(ConditionalGetMixin, KeysetPaginationMixin, TemplateView):
     """
     Esta es una vista de posts,
     cuyo criterio de filtrado es una categoría.
+
+    Vista async: la categoria, su pagina de posts y el contexto de
+    base.html se consultan a la vez.
     """
 
-    model = Post
-    context_object_name = "posts"
+    template_name = "blog/post_list.html"
+    etag_versions = LAYOUT_VERSIONS
+    concurrent_queries = True
+
+    def get_validators(self, request, *args, **kwargs):
+        """
+        Fecha de la categoria y del ultimo post visible modificado; el
+        contador de publicados cubre los posts que salen de la categoria.
+        """
+        row = (
+            Category.objects.filter(slug=kwargs["slug"])
+            .annotate(last=Max("posts__updated", filter=Q(posts__is_live=True)))
+            .values_list("updated", "last", "published_posts_count")
+            .first()
+        )
+        if row is None:
+            return None
+        updated, last, count = row
+        return row, max(updated, last or updated)
 
     def get_queryset(self):
         """
         Obtiene el queryset de publicaciones filtradas por una categoría específica.
 
-        - Recupera la categoría a partir del slug recibido en la URL.
-        - Almacena la categoría en `self.category` para reutilizarla
-          posteriormente en otros métodos de la vista.
+        - Filtra por el slug recibido en la URL, sin esperar a la categoría,
+          para poder consultar ambas en paralelo.
         - Retorna únicamente los posts asociados a dicha categoría
           mediante la relación inversa ManyToMany.
 
         Returns:
             QuerySet: Lista de objetos Post pertenecientes a la categoría.
         """
-        self.category = get_object_or_404(Category, slug=self.kwargs["slug"])
         return (
-            self.category.posts.published()
+            Post.objects.published()
+            .filter(categories__slug=self.kwargs["slug"])
+            .for_listing()
             .select_related("user")
             .prefetch_related("categories")
         )
 
-    def get_context_data(self, **kwargs):
+    async def get(self, request, *args, **kwargs):
         """
         Amplía el contexto base de la vista para incluir información
         relacionada con la categoría activa.
@@ -62,41 +162,200 @@ class PostByCategoryView(ListView):
         - Mensajes personalizados
         - Encabezados dinámicos
 
-        La categoría se obtiene previamente en `get_queryset` y se mantiene
-        como estado de la vista durante todo el ciclo de la request.
+        Si la categoría no existe se responde 404 aunque la página de
+        posts ya se haya consultado.
         """
-        context = super().get_context_data(**kwargs)
-        context["category"] = self.category
-        return context
+        results = await gather_queries(
+            {
+                "category": aget_object_or_404(Category, slug=self.kwargs["slug"]),
+                "page": self.aget_keyset_page(self.get_queryset(), self.paginate_by),
+                **layout_queries(),
+            },
+            concurrent=self.concurrent_queries,
+        )
+        context = self.get_context_data(**kwargs)
+        context.update(self.get_page_context("posts", *results.pop("page")))
+        context.update(results)
+        return self.render_to_response(context)
+
+
+class ArchiveMonthView(CachedResponseMixin, KeysetPaginationMixin, TemplateView):
+    """
+    Posts publicados en un mes, con la misma paginacion por cursor que el
+    listado. Los meses y las categorias del menu salen de los contadores
+    materializados (PostMonth, published_posts_count), sin agrupar posts.
+
+    Vista async: el mes, su pagina de posts, los menus y el contexto de
+    base.html se consultan a la vez.
+    """
+
+    template_name = "blog/post_archive.html"
+    concurrent_queries = True
+
+    def get_queryset(self):
+        start, end = month_range(self.kwargs["year"], self.kwargs["month"])
+        return (
+            Post.objects.published()
+            .filter(publish_at__gte=start, publish_at__lt=end)
+            .for_listing()
+            .select_related("user")
+        )
+
+    async def get(self, request, *args, **kwargs):
+        # Antes de crear las consultas: month_range fallaria con ValueError
+        # (un 500) y las corrutinas ya creadas quedarian sin esperar.
+        if not is_valid_month(kwargs["year"], kwargs["month"]):
+            raise Http404("Mes invalido")
+        results = await gather_queries(
+            {
+                "month": aget_object_or_404(
+                    PostMonth.objects.with_posts(),
+                    year=kwargs["year"],
+                    month=kwargs["month"],
+                ),
+                "page": self.aget_keyset_page(self.get_queryset(), self.paginate_by),
+                "archive_months": PostMonth.objects.with_posts(),
+                "archive_categories": Category.objects.filter(
+                    published_posts_count__gt=0
+                ).order_by("name"),
+                **layout_queries(),
+            },
+            concurrent=self.concurrent_queries,
+        )
+        context = self.get_context_data(**kwargs)
+        context.update(self.get_page_context("posts", *results.pop("page")))
+        context.update(results)
+        return self.render_to_response(context)
 
 
-class HomeView(TemplateView):
+class HomeView(ConditionalGetMixin, CachedResponseMixin, TemplateView):
+    """
+    Vista async: las consultas de la portada son independientes y se
+    ejecutan a la vez; la latencia es la de la mas lenta.
+    """
+
     template_name = "blog/home.html"
+    # La version de contenido cubre todo lo que muestra la portada, tambien
+    # los cambios sin `updated` (popularidad)
+    etag_versions = (CONTENT_VERSION, *LAYOUT_VERSIONS)
+    concurrent_queries = True
+
+    def get_validators(self, request, *args, **kwargs):
+        # Solo versiones: un acierto de cache no consulta la base de datos.
+        # Sin Last-Modified, que requeriria agregar fechas en cada request.
+        return (), None
+
+    async def get(self, request, *args, **kwargs):
+        context = self.get_context_data(**kwargs)
+        results = await gather_queries(
+            {
+                "main_categories": Category.objects.categories_for_home(),
+                "popular_posts": Post.objects.for_home_popular(),
+                "latest_posts": Post.objects.for_home_latest(),
+                # "author": Author.objects.site_author(),
+                "featured_post": Post.objects.for_home_featured,
+                # "seo_content": StaticPage.objects.get(slug="seo-home").content,
+                **layout_queries(),
+            },
+            concurrent=self.concurrent_queries,
+        )
+        context.update(results)
+        return self.render_to_response(context)
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        context["main_categories"] = Category.objects.categories_for_home()
-        context["popular_posts"] = Post.objects.for_home_popular()
-        context["latest_posts"] = Post.objects.for_home_latest()
-        # context["author"] = Author.objects.site_author()
-        context["featured_post"] = Post.objects.for_home_featured()
-        # context["seo_content"] = StaticPage.objects.get(slug="seo-home").content
-        return context
 
+class AuthorDetailView(KeysetPaginationMixin, DetailView):
+    """
+    Vista async: el autor, su pagina de posts y el contexto de base.html
+    se consultan a la vez.
+    """
 
-class AuthorDetailView(DetailView):
     model = Author
     context_object_name = "author"
+    concurrent_queries = True
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        context["posts"] = (
+    def get_posts_queryset(self):
+        # Por el pk del autor, sin esperar a cargarlo
+        return (
             Post.objects.published()
-            .filter(user=self.object.user)
+            .for_listing()
+            .filter(user__author_profile__pk=self.kwargs["pk"])
             .select_related("user")
             .prefetch_related("categories")
         )
-        return context
+
+    async def get(self, request, *args, **kwargs):
+        results = await gather_queries(
+            {
+                "author": aget_object_or_404(self.get_queryset(), pk=kwargs["pk"]),
+                "page": self.aget_keyset_page(
+                    self.get_posts_queryset(), self.paginate_by
+                ),
+                **layout_queries(),
+            },
+            concurrent=self.concurrent_queries,
+        )
+        self.object = results.pop("author")
+        context = self.get_context_data(object=self.object)
+        context.update(self.get_page_context("posts", *results.pop("page")))
+        context.update(results)
+        return self.render_to_response(context)
 
     def get_queryset(self):
         return Author.objects.select_related("user")
+
+
+class StaticPageView(ConditionalGetMixin, TemplateView):
+    """
+    Pagina estatica por slug, desde la tabla en memoria de blog.registry:
+    sin consultas, tambien cuando el slug no existe.
+    """
+
+    template_name = "blog/static_page.html"
+    etag_versions = (*LAYOUT_VERSIONS, STATIC_PAGES_VERSION)
+
+    def get_validators(self, request, *args, **kwargs):
+        # La version de las paginas estaticas va en etag_versions
+        if get_static_page(kwargs["slug"]) is None:
+            return None
+        return (kwargs["slug"],), None
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        page = get_static_page(kwargs["slug"])
+        if page is None:
+            raise Http404("No existe la pagina")
+        context["page"] = page
+        return context
+
+
+class SearchPostView(TemplateView):
+    """
+    Busqueda de texto completo sobre titulo y contenido de los posts
+    publicados, usando el indice de `blog.search`.
+    """
+
+    template_name = "blog/search_results.html"
+    paginate_by = 10
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        query = self.request.GET.get("q", "").strip()
+        paginator = SearchPaginator(
+            Post.objects.published().for_listing().select_related("user"),
+            query,
+            self.paginate_by,
+        )
+        try:
+            page = paginator.get_page(after=self.request.GET.get("after"))
+        except InvalidPage as e:
+            raise Http404(str(e))
+        context.update(
+            {
+                "query": query,
+                "posts": page.object_list,
+                "paginator": paginator,
+                "page_obj": page,
+                "is_paginated": page.has_other_pages(),
+            }
+        )
+        return context
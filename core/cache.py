@@ -0,0 +1,210 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache as BaseLocMemCache
+from django.db import transaction
+
+from .metrics import record_cache
+from .routers import bound_timeout, used_replica
+
+_missing = object()
+
+
+def version_key(name):
+    return f"version:{name}"
+
+
+def get_version(name):
+    """
+    Retorna la version actual de un grupo de contenido.
+
+    Si la clave no existe (cache vacia o expulsada) se inicializa con la hora
+    actual en nanosegundos para no repetir una version usada antes.
+    """
+    key = version_key(name)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+async def aget_version(name):
+    """Equivalente async de get_version."""
+    key = version_key(name)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, time.time_ns(), None)
+        version = await cache.aget(key)
+    return version
+
+
+def bump_version(name):
+    """Invalida todas las entradas asociadas a `name` cambiando su version."""
+    key = version_key(name)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        version = time.time_ns()
+        cache.set(key, version, None)
+        return version
+
+
+def bump_version_on_commit(name):
+    """
+    bump_version despues del commit de la transaccion actual (en el acto
+    fuera de una). Si se incrementara antes, una request concurrente
+    podria guardar en cache, con la version nueva, los datos sin el cambio.
+    """
+    transaction.on_commit(lambda: bump_version(name))
+
+
+class LocalCache:
+    """
+    Cache LRU con TTL en la memoria del proceso, delante de la cache
+    compartida. No necesita invalidacion propia: las claves incluyen la
+    version del grupo de contenido (ver get_or_set_versioned).
+    """
+
+    def __init__(self, max_entries=None, ttl=None):
+        self.max_entries = max_entries or getattr(
+            settings, "LOCAL_CACHE_MAX_ENTRIES", 256
+        )
+        self.ttl = ttl or getattr(settings, "LOCAL_CACHE_TTL", 60)
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            value, expires = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+local_cache = LocalCache()
+
+
+class VersionedRegistry:
+    """
+    Tabla completa y pequeña en la memoria del proceso, por ejemplo
+    slug -> pagina. `loader()` la carga la primera vez que se usa y de
+    nuevo cuando cambia la version `version_name`, asi que un acceso solo
+    lee la version de la cache compartida: ni un acierto ni una clave
+    inexistente consultan la base de datos.
+
+    La version se debe incrementar despues del commit (on_commit): si otro
+    proceso recargara antes, guardaria la tabla sin el cambio hasta la
+    proxima version.
+    """
+
+    def __init__(self, version_name, loader):
+        self.version_name = version_name
+        self.loader = loader
+        self._lock = threading.Lock()
+        self._version = None
+        self._entries = {}
+
+    def get_entries(self):
+        version = get_version(self.version_name)
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self._entries = self.loader()
+                    self._version = version
+        return self._entries
+
+    def get(self, key, default=None):
+        return self.get_entries().get(key, default)
+
+    def clear(self):
+        with self._lock:
+            self._entries, self._version = {}, None
+
+
+def get_or_set_versioned(key, version_name, producer, timeout=None):
+    """
+    Retorna el valor de `key` para la version actual de `version_name`,
+    buscando en la cache del proceso, luego en la compartida y por ultimo
+    llamando a `producer()`.
+
+    La unica consulta a la cache compartida en un acierto local es la de
+    la version (un entero); cambiarla con bump_version invalida ambos
+    niveles en todos los procesos. Un valor leido de una replica (ver
+    core.routers) solo se guarda en la compartida y por poco tiempo.
+    """
+    versioned_key = f"{key}:{get_version(version_name)}"
+    value = local_cache.get(versioned_key, _missing)
+    if value is not _missing:
+        record_cache(True)
+        return value
+    value = cache.get(versioned_key, _missing)
+    if value is _missing:
+        value = producer()
+        cache.set(versioned_key, value, bound_timeout(timeout))
+        if used_replica():
+            return value
+    local_cache.set(versioned_key, value)
+    return value
+
+
+async def aget_or_set_versioned(key, version_name, producer, timeout=None):
+    """
+    Equivalente async de get_or_set_versioned; `producer` es una funcion
+    async. Comparte las claves con la version sincrona.
+    """
+    versioned_key = f"{key}:{await aget_version(version_name)}"
+    value = local_cache.get(versioned_key, _missing)
+    if value is not _missing:
+        record_cache(True)
+        return value
+    value = await cache.aget(versioned_key, _missing)
+    if value is _missing:
+        value = await producer()
+        await cache.aset(versioned_key, value, bound_timeout(timeout))
+        if used_replica():
+            return value
+    local_cache.set(versioned_key, value)
+    return value
+
+
+class InstrumentedCacheMixin:
+    """
+    Cuenta aciertos y fallos en las metricas de la request (core.metrics).
+    Se combina con la clase del backend, ver CACHES en settings.
+    """
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _missing, version)
+        record_cache(value is not _missing)
+        return default if value is _missing else value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        found = super().get_many(keys, version)
+        record_cache(True, len(found))
+        record_cache(False, len(keys) - len(found))
+        return found
+
+
+class LocMemCache(InstrumentedCacheMixin, BaseLocMemCache):
+    pass
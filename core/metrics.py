@@ -0,0 +1,141 @@
+"""
+Metricas de la request en curso (ver core.middleware.PerformanceMiddleware);
+el comando benchmark mide con la misma instrumentacion (blog.benchmarks).
+
+El estado vive en una ContextVar: fuera de una request muestreada
+`current()` retorna None y los puntos de medicion no hacen nada.
+sync_to_async copia el contexto, asi que tambien se miden las consultas
+que las vistas async ejecutan en otros hilos.
+"""
+
+import threading
+import time
+from contextvars import ContextVar
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.template import base as template_base
+
+_current = ContextVar("request_metrics", default=None)
+
+
+class RequestMetrics:
+    def __init__(self, max_sql=50):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.template_db_time = 0.0
+        self.template_depth = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.fragment_hits = 0
+        self.fragment_misses = 0
+        self.max_sql = max_sql
+        self.statements = []
+        # Las consultas concurrentes (core.concurrency) llegan desde varios hilos
+        self._lock = threading.Lock()
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.queries += 1
+                self.db_time += elapsed
+                if self.template_depth:
+                    self.template_db_time += elapsed
+                if len(self.statements) < self.max_sql:
+                    self.statements.append((elapsed, sql))
+
+    def slowest_statements(self, count=10):
+        return sorted(self.statements, key=lambda item: item[0], reverse=True)[:count]
+
+
+def current():
+    return _current.get()
+
+
+def activate(metrics):
+    return _current.set(metrics)
+
+
+def deactivate(token):
+    _current.reset(token)
+
+
+def record_cache(hit, count=1):
+    metrics = _current.get()
+    if metrics is None:
+        return
+    if hit:
+        metrics.cache_hits += count
+    else:
+        metrics.cache_misses += count
+
+
+def record_fragment(hit):
+    metrics = _current.get()
+    if metrics is None:
+        return
+    if hit:
+        metrics.fragment_hits += 1
+    else:
+        metrics.fragment_misses += 1
+
+
+def execute_wrapper(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics.execute_wrapper(execute, sql, params, many, context)
+
+
+def _add_execute_wrapper(sender, connection, **kwargs):
+    if execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(execute_wrapper)
+
+
+def install_query_recorder():
+    """
+    Agrega `execute_wrapper` a cada conexion, tambien a las que se abren en
+    los hilos del pool. Sin request muestreada el costo es una lectura de
+    la ContextVar por consulta.
+    """
+    connection_created.connect(
+        _add_execute_wrapper, dispatch_uid="core.metrics.execute_wrapper"
+    )
+    for connection in connections.all(initialized_only=True):
+        _add_execute_wrapper(None, connection)
+
+
+_template_render = None
+
+
+def install_template_timer():
+    """
+    Envuelve Template.render una sola vez. Sin request muestreada el costo
+    es una lectura de la ContextVar por plantilla.
+    """
+    global _template_render
+    if _template_render is not None:
+        return
+    _template_render = original = template_base.Template.render
+
+    def render(self, context):
+        metrics = _current.get()
+        if metrics is None:
+            return original(self, context)
+        metrics.template_depth += 1
+        started = time.perf_counter()
+        try:
+            return original(self, context)
+        finally:
+            metrics.template_depth -= 1
+            # Solo la plantilla de nivel superior; los include quedan dentro
+            if metrics.template_depth == 0:
+                metrics.template_time += time.perf_counter() - started
+
+    template_base.Template.render = render
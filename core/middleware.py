@@ -0,0 +1,205 @@
+import json
+import logging
+import random
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from . import metrics, routers
+
+logger = logging.getLogger("core.performance")
+
+
+class PerformanceMiddleware:
+    """
+    Mide cada request muestreada (PERFORMANCE_SAMPLE_RATE): consultas SQL y
+    su tiempo, aciertos y fallos de cache (y de fragmentos de plantilla),
+    tiempo de plantillas y total.
+    Los valores se envian en la cabecera Server-Timing y en una linea de
+    log JSON; si la request supera PERFORMANCE_SLOW_REQUEST_MS el log
+    incluye las consultas mas lentas.
+
+    Las requests no muestreadas solo miden el tiempo total para detectar
+    las lentas (sin SQL).
+
+    Funciona en modo sincrono y async, para no forzar un cambio de hilo
+    delante de las vistas async bajo ASGI.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, "PERFORMANCE_SAMPLE_RATE", 0.0)
+        self.slow_ms = getattr(settings, "PERFORMANCE_SLOW_REQUEST_MS", 500)
+        self.server_timing = getattr(settings, "PERFORMANCE_SERVER_TIMING", True)
+        self.max_sql = getattr(settings, "PERFORMANCE_MAX_SQL", 50)
+        if self.sample_rate:
+            metrics.install_query_recorder()
+            metrics.install_template_timer()
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def sample(self):
+        if not self.sample_rate or random.random() >= self.sample_rate:
+            return None
+        return metrics.RequestMetrics(max_sql=self.max_sql)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = time.perf_counter()
+        current = self.sample()
+        if current is None:
+            return self.finish_unsampled(request, self.get_response(request), started)
+        token = metrics.activate(current)
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.deactivate(token)
+        return self.finish(request, response, current)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        current = self.sample()
+        if current is None:
+            response = await self.get_response(request)
+            return self.finish_unsampled(request, response, started)
+        token = metrics.activate(current)
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.deactivate(token)
+        return self.finish(request, response, current)
+
+    def finish_unsampled(self, request, response, started):
+        total_ms = (time.perf_counter() - started) * 1000
+        if total_ms >= self.slow_ms:
+            data = {"total_ms": round(total_ms, 1)}
+            self.log(request, response, data, slow=True)
+        return response
+
+    def finish(self, request, response, current):
+        total_ms = (time.perf_counter() - current.started) * 1000
+        db_ms = current.db_time * 1000
+        template_ms = (current.template_time - current.template_db_time) * 1000
+        data = {
+            "total_ms": round(total_ms, 1),
+            "db_ms": round(db_ms, 1),
+            "queries": current.queries,
+            "template_ms": round(template_ms, 1),
+            "app_ms": round(max(total_ms - db_ms - template_ms, 0), 1),
+            "cache_hits": current.cache_hits,
+            "cache_misses": current.cache_misses,
+            "fragment_hits": current.fragment_hits,
+            "fragment_misses": current.fragment_misses,
+        }
+        if self.server_timing:
+            response["Server-Timing"] = self.server_timing_header(data)
+
+        slow = total_ms >= self.slow_ms
+        if slow:
+            data["sql"] = [
+                {"ms": round(elapsed * 1000, 2), "sql": sql}
+                for elapsed, sql in current.slowest_statements()
+            ]
+        self.log(request, response, data, slow=slow)
+        return response
+
+    @staticmethod
+    def server_timing_header(data):
+        return ", ".join(
+            [
+                f'db;dur={data["db_ms"]};desc="{data["queries"]} queries"',
+                f"tpl;dur={data['template_ms']}",
+                f"app;dur={data['app_ms']}",
+                f'cache;desc="hits={data["cache_hits"]} misses={data["cache_misses"]}"',
+                f'frag;desc="hits={data["fragment_hits"]} '
+                f'misses={data["fragment_misses"]}"',
+                f"total;dur={data['total_ms']}",
+            ]
+        )
+
+    def log(self, request, response, data, slow=False):
+        record = {
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "slow": slow,
+            **data,
+        }
+        level = logging.WARNING if slow else logging.INFO
+        logger.log(level, json.dumps(record, default=str))
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Habilita core.routers.ReplicaRouter para las lecturas de la request.
+
+    Se queda en la base principal toda request que no sea de lectura, las
+    rutas de DATABASE_PRIMARY_PATHS (el admin) y las de un cliente que
+    escribio hace menos de DATABASE_PRIMARY_PIN_SECONDS: al escribir se le
+    envia una cookie con el instante hasta el que sigue fijado.
+    """
+
+    sync_capable = True
+    async_capable = True
+    cookie_name = "primary_pin"
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.primary_paths = tuple(
+            getattr(settings, "DATABASE_PRIMARY_PATHS", ("/admin/",))
+        )
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def is_pinned(self, request):
+        if request.method not in ("GET", "HEAD", "OPTIONS"):
+            return True
+        if request.path.startswith(self.primary_paths):
+            return True
+        try:
+            until = float(request.COOKIES.get(self.cookie_name, 0))
+        except ValueError:
+            return False
+        # La cookie la controla el cliente: no se acepta mas que una ventana
+        # (mas un segundo de margen por el redondeo del valor)
+        now = time.time()
+        return now < until <= now + routers.get_pin_seconds() + 1
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not routers.get_replicas():
+            return self.get_response(request)
+        token = routers.begin(self.is_pinned(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            state = routers.end(token)
+        return self.finish(response, state)
+
+    async def __acall__(self, request):
+        if not routers.get_replicas():
+            return await self.get_response(request)
+        token = routers.begin(self.is_pinned(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            state = routers.end(token)
+        return self.finish(response, state)
+
+    def finish(self, response, state):
+        if state.wrote:
+            pin = routers.get_pin_seconds()
+            response.set_cookie(
+                self.cookie_name,
+                f"{time.time() + pin:.3f}",
+                max_age=pin,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
@@ -0,0 +1,88 @@
+import asyncio
+import hashlib
+from calendar import timegm
+
+from asgiref.sync import sync_to_async
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .cache import aget_version, get_version
+
+
+class ConditionalGetMixin:
+    """
+    Soporte de GET condicional (ETag / Last-Modified / 304).
+
+    Antes de ejecutar la vista se calculan los validadores con
+    `get_validators()`, que debe usar una consulta pequeña e indexada;
+    si el cliente ya tiene la version actual se responde 304 sin
+    hidratar objetos ni renderizar templates.
+    En las vistas async `get_validators()` se ejecuta en un hilo.
+    """
+
+    # Versiones (core.cache) de otros datos que muestra la pagina, por
+    # ejemplo los de la plantilla base; forman parte del ETag.
+    etag_versions = ()
+
+    def get_validators(self, request, *args, **kwargs):
+        """
+        Retorna `(partes, last_modified)`: las partes forman el ETag junto con
+        los parametros de la URL. None desactiva el GET condicional (por
+        ejemplo si el objeto no existe y la vista respondera 404).
+        """
+        return None
+
+    @staticmethod
+    def get_etag(request, validators, versions):
+        parts, last_modified = validators
+        validators = (parts, last_modified, versions, request.GET.urlencode())
+        digest = hashlib.md5(repr(validators).encode(), usedforsecurity=False)
+        etag = quote_etag(digest.hexdigest())
+        timestamp = timegm(last_modified.utctimetuple()) if last_modified else None
+        return etag, timestamp
+
+    @staticmethod
+    def set_validators(response, etag, timestamp):
+        if response.status_code in (200, 304):
+            response.headers.setdefault("ETag", etag)
+            if timestamp is not None:
+                response.headers.setdefault("Last-Modified", http_date(timestamp))
+        return response
+
+    def dispatch(self, request, *args, **kwargs):
+        if self.view_is_async:
+            return self.aconditional_dispatch(request, *args, **kwargs)
+        if request.method not in ("GET", "HEAD"):
+            return super().dispatch(request, *args, **kwargs)
+        validators = self.get_validators(request, *args, **kwargs)
+        if validators is None:
+            return super().dispatch(request, *args, **kwargs)
+
+        versions = [get_version(name) for name in self.etag_versions]
+        etag, timestamp = self.get_etag(request, validators, versions)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=timestamp
+        )
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+        return self.set_validators(response, etag, timestamp)
+
+    async def aconditional_dispatch(self, request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return await super().dispatch(request, *args, **kwargs)
+        validators = await sync_to_async(self.get_validators)(
+            request, *args, **kwargs
+        )
+        if validators is None:
+            return await super().dispatch(request, *args, **kwargs)
+
+        versions = await asyncio.gather(
+            *(aget_version(name) for name in self.etag_versions)
+        )
+        etag, timestamp = self.get_etag(request, validators, list(versions))
+        response = get_conditional_response(
+            request, etag=etag, last_modified=timestamp
+        )
+        if response is None:
+            response = await super().dispatch(request, *args, **kwargs)
+        return self.set_validators(response, etag, timestamp)
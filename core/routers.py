@@ -0,0 +1,143 @@
+"""
+Enrutado de lecturas a replicas (DATABASE_REPLICAS).
+
+Solo van a una replica las lecturas de los modelos publicos
+(DATABASE_REPLICA_APPS) hechas dentro de una request que
+core.middleware.ReplicaRoutingMiddleware marco como apta. Escrituras,
+admin, comandos y las requests de un cliente que acaba de escribir usan
+la base principal.
+"""
+
+import threading
+from collections import Counter
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+_current = ContextVar("db_routing", default=None)
+
+
+def get_replicas():
+    return list(getattr(settings, "DATABASE_REPLICAS", ()))
+
+
+def get_pin_seconds():
+    return getattr(settings, "DATABASE_PRIMARY_PIN_SECONDS", 5)
+
+
+class RoutingState:
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+        self.replica = None
+        self.wrote = False
+
+
+class ReplicaSelector:
+    """
+    Elige la replica de cada request: por turnos (`round_robin`) o la que
+    tiene menos requests en curso en este proceso (`least_load`, los
+    empates se reparten por turnos).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._next = 0
+        self._in_flight = Counter()
+
+    def acquire(self, replicas, strategy):
+        with self._lock:
+            start = self._next % len(replicas)
+            self._next += 1
+            order = replicas[start:] + replicas[:start]
+            if strategy == "least_load":
+                alias = min(order, key=lambda alias: self._in_flight[alias])
+            else:
+                alias = order[0]
+            self._in_flight[alias] += 1
+        return alias
+
+    def release(self, alias):
+        with self._lock:
+            self._in_flight[alias] -= 1
+            if self._in_flight[alias] <= 0:
+                del self._in_flight[alias]
+
+
+selector = ReplicaSelector()
+
+
+def begin(pinned=False):
+    """Activa el enrutado a replicas para la request en curso."""
+    return _current.set(RoutingState(pinned))
+
+
+def end(token):
+    """Libera la replica elegida y retorna el estado de la request."""
+    state = _current.get()
+    _current.reset(token)
+    if state.replica is not None:
+        selector.release(state.replica)
+    return state
+
+
+def pin_to_primary():
+    """Lo que queda de la request lee de la base principal."""
+    state = _current.get()
+    if state is not None:
+        state.pinned = True
+
+
+def used_replica():
+    state = _current.get()
+    return state is not None and state.replica is not None
+
+
+def bound_timeout(timeout):
+    """
+    TTL para guardar en cache datos leidos en esta request. Si vinieron de
+    una replica pueden estar atrasados respecto de la version actual, asi
+    que no se guardan mas que la ventana DATABASE_PRIMARY_PIN_SECONDS.
+    """
+    if not used_replica():
+        return timeout
+    pin = get_pin_seconds()
+    return pin if timeout is None else min(timeout, pin)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        state = _current.get()
+        apps = getattr(settings, "DATABASE_REPLICA_APPS", ())
+        if state is None or state.pinned or model._meta.app_label not in apps:
+            return DEFAULT_DB_ALIAS
+        replicas = get_replicas()
+        if not replicas:
+            return DEFAULT_DB_ALIAS
+        if state.replica is None:
+            strategy = getattr(settings, "DATABASE_REPLICA_SELECTION", "round_robin")
+            state.replica = selector.acquire(replicas, strategy)
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = _current.get()
+        if state is not None:
+            # Lo que se lea despues en la request debe ver esta escritura
+            state.pinned = True
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *get_replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Las replicas reciben el esquema por replicacion (o sync_replicas)
+        if db in get_replicas():
+            return False
+        return None
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -42,6 +43,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "core.middleware.PerformanceMiddleware",
+    "core.middleware.ReplicaRoutingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -123,7 +126,109 @@ STATICFILES_DIRS = [
     BASE_DIR / "static",
 ]
 
+MEDIA_URL = "media/"
+MEDIA_ROOT = BASE_DIR / "media"
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+
+# Blog
+# Visitas: buffer en memoria por proceso, escrito por lotes (blog.hits)
+BLOG_VIEWS_BUFFER_SIZE = 500
+BLOG_VIEWS_FLUSH_INTERVAL = 30  # segundos
+
+# Popularidad: ver el comando update_popularity
+BLOG_POPULARITY_WINDOW_DAYS = 30
+BLOG_POPULARITY_HALF_LIFE_DAYS = 7
+
+# Cache de respuestas completas (HomeView, pagina 1 de ListPostView).
+# Se invalidan por version de contenido (None = sin TTL); si hay un post
+# programado expiran a su hora de publicacion.
+BLOG_PAGE_CACHE_TIMEOUT = None
+
+# Worker de publicacion programada: manage.py publish_scheduled --loop
+BLOG_SCHEDULER_INTERVAL = 60  # segundos
+
+# Busqueda: None elige el motor segun la base de datos (ver blog.search)
+BLOG_SEARCH_BACKEND = None
+BLOG_SEARCH_CONFIG = "spanish"  # configuracion de texto de PostgreSQL
+
+# Exportacion estatica: manage.py export_static
+BLOG_EXPORT_DIR = BASE_DIR / "export"
+
+# Imagenes: variantes WebP/JPEG de Post.image y Author.avatar (blog.images)
+BLOG_IMAGE_WIDTHS = (320, 640, 1280)
+BLOG_IMAGE_QUALITY = 80
+BLOG_IMAGE_WORKERS = 2
+BLOG_IMAGE_ASYNC = True  # False procesa dentro de la request que guarda
+
+# Feeds Atom/RSS: numero de posts por feed (blog.feeds)
+BLOG_FEED_ITEMS = 50
+
+# Benchmark: linea base de manage.py benchmark (ver blog.benchmarks)
+BLOG_BENCHMARK_BASELINE = BASE_DIR / "benchmark.json"
+
+# Cache por defecto con conteo de aciertos/fallos para core.middleware
+CACHES = {
+    "default": {
+        "BACKEND": "core.cache.LocMemCache",
+    }
+}
+
+# Instrumentacion por request (core.middleware.PerformanceMiddleware):
+# fraccion de requests medidas (0 = desactivado), umbral de request lenta
+# y cabecera Server-Timing en las respuestas medidas.
+PERFORMANCE_SAMPLE_RATE = 0.0
+PERFORMANCE_SLOW_REQUEST_MS = 500
+PERFORMANCE_SERVER_TIMING = True
+PERFORMANCE_MAX_SQL = 50  # consultas guardadas por request para el log
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {"console": {"class": "logging.StreamHandler"}},
+    "loggers": {
+        "core.performance": {"handlers": ["console"], "level": "INFO"},
+    },
+}
+
+# Fragmentos de plantilla ({% cachefragment %}, ver blog.fragments)
+FRAGMENT_CACHE_TIMEOUT = 60 * 60 * 24
+FRAGMENT_CACHE_LOCAL_ENTRIES = 2000
+FRAGMENT_CACHE_LOCAL_TTL = 300  # segundos en la memoria del proceso
+
+# Retencion: manage.py purge_deleted mueve a PostArchive los posts
+# eliminados hace mas de estos dias (ver blog.retention)
+BLOG_DELETED_RETENTION_DAYS = 30
+BLOG_PURGE_INTERVAL = 60 * 60  # segundos entre pasadas con --loop
+
+# Replicas de lectura (core.routers.ReplicaRouter): alias de DATABASES que
+# reciben las lecturas publicas de estas apps. Las escrituras, el admin y
+# los clientes que escribieron hace menos de DATABASE_PRIMARY_PIN_SECONDS
+# usan "default"; esa ventana debe cubrir el atraso de las replicas.
+DATABASE_ROUTERS = ["core.routers.ReplicaRouter"]
+DATABASE_REPLICAS = []
+DATABASE_REPLICA_APPS = ("blog", "pages")
+DATABASE_REPLICA_SELECTION = "round_robin"  # o "least_load"
+DATABASE_PRIMARY_PIN_SECONDS = 5
+DATABASE_PRIMARY_PATHS = ("/admin/",)
+
+# Prueba local: SQLITE_REPLICAS=2 crea replica1.sqlite3 y replica2.sqlite3,
+# copias de db.sqlite3 que se actualizan con manage.py sync_replicas
+for index in range(1, int(os.environ.get("SQLITE_REPLICAS", 0)) + 1):
+    DATABASES[f"replica{index}"] = {
+        **DATABASES["default"],
+        "NAME": BASE_DIR / f"replica{index}.sqlite3",
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(f"replica{index}")
+
+# Posts relacionados por post (RelatedPost, ver blog.related)
+BLOG_RELATED_POSTS = 4
+
+# Historial de posts (PostRevision, ver blog.revisions): una revision
+# completa cada tantas; las demas son deltas contra la anterior
+BLOG_REVISION_KEYFRAME_INTERVAL = 20
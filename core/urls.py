@@ -15,13 +15,27 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 
+from django.conf import settings
+from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
-from blog.views import HomeView
+from blog.sitemaps import SitemapIndexView, SitemapSectionView
+from blog.views import HomeView, StaticPageView
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("blog/", include("blog.urls")),
     path("", HomeView.as_view(), name="home"),
     path("pages/", include("pages.urls")),
+    path("sitemap.xml", SitemapIndexView.as_view(), name="sitemap"),
+    path(
+        "sitemap-<slug:section>-<int:shard>.xml",
+        SitemapSectionView.as_view(),
+        name="sitemap_section",
+    ),
+    # Ultima: el resto de slugs de la raiz son paginas estaticas
+    path("<slug:slug>/", StaticPageView.as_view(), name="static_page"),
 ]
+
+if settings.DEBUG:
+    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
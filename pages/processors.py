@@ -1,14 +1,32 @@
+from django.utils.functional import SimpleLazyObject
+
+from core.cache import aget_or_set_versioned, get_or_set_versioned
+
 from .models import Page
-from django.core.cache import cache
+from .signals import FOOTER_VERSION
+
+
+def footer_queryset():
+    return Page.objects.filter(is_active=True, show_in_footer=True).only(
+        "title", "slug"
+    )
+
+
+async def _footer_pages():
+    return [page async for page in footer_queryset()]
+
+
+def get_footer_pages():
+    return get_or_set_versioned(
+        "footer_pages", FOOTER_VERSION, lambda: list(footer_queryset())
+    )
+
+
+async def aget_footer_pages():
+    # Las vistas async lo resuelven junto con sus consultas (gather_queries)
+    return await aget_or_set_versioned("footer_pages", FOOTER_VERSION, _footer_pages)
 
 
 def footer_pages(request):
-    pages = cache.get("footer_pages")
-    if pages is None:
-        pages = list(
-            Page.objects.filter(is_active=True, show_in_footer=True).only(
-                "title", "slug"
-            )
-        )
-        cache.set("footer_pages", pages, 60 * 60)
-    return {"footer_pages": pages}
+    # Perezoso: solo las plantillas que usan footer_pages consultan la cache
+    return {"footer_pages": SimpleLazyObject(get_footer_pages)}
@@ -0,0 +1,25 @@
+"""
+Paginas en la memoria del proceso, por slug (ver core.cache.VersionedRegistry).
+
+La tabla es pequeña y cambia poco: PageDetailView responde, tambien los
+404, sin consultar la base de datos.
+"""
+
+from django.db import DEFAULT_DB_ALIAS
+
+from core.cache import VersionedRegistry
+
+from .models import Page
+from .signals import PAGES_VERSION
+
+
+def load_pages():
+    # De la base principal: una replica atrasada quedaria en memoria
+    return {page.slug: page for page in Page.objects.using(DEFAULT_DB_ALIAS)}
+
+
+pages = VersionedRegistry(PAGES_VERSION, load_pages)
+
+
+def get_page(slug):
+    return pages.get(slug)
@@ -0,0 +1,24 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.cache import bump_version_on_commit
+
+from .models import Page
+
+# Version de las paginas del pie (pages.processors.footer_pages)
+FOOTER_VERSION = "pages:footer"
+# Version de la tabla de paginas en memoria (pages.registry)
+PAGES_VERSION = "pages:pages"
+
+
+@receiver(post_save, sender=Page)
+@receiver(post_delete, sender=Page)
+def bump_footer_version(sender, **kwargs):
+    bump_version_on_commit(FOOTER_VERSION)
+
+
+@receiver(post_save, sender=Page)
+@receiver(post_delete, sender=Page)
+def bump_pages_version(sender, **kwargs):
+    # Tras el commit, ver core.cache.VersionedRegistry
+    bump_version_on_commit(PAGES_VERSION)
@@ -1,9 +1,27 @@
-from django.shortcuts import render
+from django.http import Http404
 from django.views.generic import DetailView
+from blog.mixins import LAYOUT_VERSIONS
+from core.mixins import ConditionalGetMixin
 from .models import Page
+from .registry import get_page
 
 
 # Create your views here.
-class PageDetailView(DetailView):
+class PageDetailView(ConditionalGetMixin, DetailView):
+    """La pagina sale de pages.registry: sin consultas, tambien en un 404."""
+
     model = Page
     context_object_name = "page"
+    etag_versions = LAYOUT_VERSIONS
+
+    def get_validators(self, request, *args, **kwargs):
+        page = get_page(kwargs["slug"])
+        if page is None:
+            return None
+        return page.updated, page.updated
+
+    def get_object(self, queryset=None):
+        page = get_page(self.kwargs["slug"])
+        if page is None:
+            raise Http404("No existe la pagina")
+        return page